@@ -2,6 +2,9 @@ from dotenv import load_dotenv
 import psycopg2
 import pandas as pd
 import os
+import sys
+sys.path.append("../../DS01/ex01")
+from query_log import InstrumentedCursor
 
 
 def load_env_vars(env_path: str):
@@ -15,7 +18,9 @@ def load_env_vars(env_path: str):
         "user": os.getenv("DB_USER"),
         "password": os.getenv("DB_PASS"),
         "host": os.getenv("DB_HOST"),
-        "port": os.getenv("DB_PORT")
+        "port": os.getenv("DB_PORT"),
+        "query_log": os.getenv("QUERY_LOG"),
+        "query_explain": os.getenv("QUERY_EXPLAIN") == "1"
     }
 
 
@@ -23,6 +28,7 @@ def connect_db(db_config):
     """
     Establish a connection to the PostgreSQL
     database using the provided config.
+    If QUERY_LOG is set, the cursor records every statement to that file.
     """
     conn = psycopg2.connect(
         dbname=db_config["dbname"],
@@ -32,7 +38,11 @@ def connect_db(db_config):
         port=db_config["port"]
     )
     conn.autocommit = True
-    return conn, conn.cursor()
+    cursor = conn.cursor()
+    if db_config.get("query_log"):
+        cursor = InstrumentedCursor(cursor, db_config["query_log"],
+                                    db_config.get("query_explain", False))
+    return conn, cursor
 
 
 def get_pg_type(dtype):
@@ -2,6 +2,10 @@ from dotenv import load_dotenv
 import psycopg2
 import pandas as pd
 import os
+import sys
+from query_log import InstrumentedCursor
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ex02"))
+from projection import refresh_purchases
 
 
 def load_env_vars(env_path: str):
@@ -15,7 +19,9 @@ def load_env_vars(env_path: str):
         "user": os.getenv("DB_USER"),
         "password": os.getenv("DB_PASS"),
         "host": os.getenv("DB_HOST"),
-        "port": os.getenv("DB_PORT")
+        "port": os.getenv("DB_PORT"),
+        "query_log": os.getenv("QUERY_LOG"),
+        "query_explain": os.getenv("QUERY_EXPLAIN") == "1"
     }
 
 
@@ -23,6 +29,7 @@ def connect_db(db_config):
     """
     Establish a connection to the PostgreSQL
     database using the provided config.
+    If QUERY_LOG is set, the cursor records every statement to that file.
     """
     conn = psycopg2.connect(
         dbname=db_config["dbname"],
@@ -32,7 +39,11 @@ def connect_db(db_config):
         port=db_config["port"]
     )
     conn.autocommit = True
-    return conn, conn.cursor()
+    cursor = conn.cursor()
+    if db_config.get("query_log"):
+        cursor = InstrumentedCursor(cursor, db_config["query_log"],
+                                    db_config.get("query_explain", False))
+    return conn, cursor
 
 
 def get_pg_type(dtype):
@@ -177,9 +188,11 @@ def select_folder(DATA_FOLDER):
 
 
 
-def select_tables_to_join(cur, csv_folder):
+def select_tables_to_join(cur, csv_folder, selection=None):
     """
     Process all CSV files in a folder and let the user select which tables to join.
+    If 'selection' is given ('all' or a list of table names),
+    it is used instead of prompting.
     """
     table_names = []
     for filename in os.listdir(csv_folder):
@@ -191,6 +204,14 @@ def select_tables_to_join(cur, csv_folder):
         print("⚠ No tables found in the folder.")
         return []
 
+    if selection == "all":
+        return table_names
+    if selection is not None:
+        unknown = [t for t in selection if t not in table_names]
+        if unknown:
+            raise ValueError(f"Tables not found in '{csv_folder}': {unknown}")
+        return list(selection)
+
     print("Please select the tables to join:")
     for i, tname in enumerate(table_names, start=1):
         print(f"Table {i}: {tname}")
@@ -234,6 +255,7 @@ def main():
         selected_tables = select_tables_to_join(cur, CSV_FOLDER)
         print(f"Tables selected: {selected_tables}")
         join_data(cur, table1, selected_tables)
+        refresh_purchases(cur, table1, rebuild=True)
     finally:
         cur.close()
         conn.close()
@@ -0,0 +1,104 @@
+import json
+import time
+import os
+
+SUMMARY_SIZE = 10
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def is_explainable(query):
+    """
+    EXPLAIN only accepts one plain DML statement.
+    """
+    text = query.strip().rstrip(";").strip()
+    return text.upper().startswith(EXPLAINABLE) and ";" not in text
+
+
+class InstrumentedCursor:
+    """
+    Wrap a psycopg2 cursor and record every statement it runs:
+    text, duration, row count and, optionally, its
+    EXPLAIN (ANALYZE, BUFFERS) plan.
+
+    Records are appended as JSON lines to log_path, and a summary of the
+    slowest statements is written and printed when the cursor is closed.
+    Any other attribute is forwarded to the wrapped cursor.
+    """
+
+    def __init__(self, cursor, log_path, explain=False):
+        self._cursor = cursor
+        self.log_path = log_path
+        self.explain = explain
+        self.run_id = f"{os.getpid()}-{int(time.time())}"
+        self.records = []
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _write(self, entry):
+        with open(self.log_path, "a") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+    def _record(self, query, seconds, plan=None):
+        entry = {
+            "run": self.run_id,
+            "query": " ".join(query.split()),
+            "seconds": round(seconds, 6),
+            "rows": self._cursor.rowcount,
+        }
+        if plan is not None:
+            entry["plan"] = plan
+        self.records.append(entry)
+        self._write(entry)
+
+    def _explain(self, query, params):
+        """
+        Run EXPLAIN (ANALYZE, BUFFERS) inside a transaction that is rolled
+        back, so data-modifying statements are not applied twice.
+        Note that the statement is still executed once more for the plan.
+        """
+        self._cursor.execute("BEGIN")
+        try:
+            self._cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}", params)
+            return "\n".join(row[0] for row in self._cursor.fetchall())
+        finally:
+            self._cursor.execute("ROLLBACK")
+
+    def execute(self, query, params=None):
+        if not isinstance(query, str):
+            query = query.as_string(self._cursor)
+        plan = None
+        if self.explain and is_explainable(query):
+            plan = self._explain(query, params)
+        start = time.perf_counter()
+        self._cursor.execute(query, params)
+        self._record(query, time.perf_counter() - start, plan)
+
+    def copy_expert(self, sql, file, *args, **kwargs):
+        start = time.perf_counter()
+        self._cursor.copy_expert(sql, file, *args, **kwargs)
+        self._record(sql, time.perf_counter() - start)
+
+    def summary(self, size=SUMMARY_SIZE):
+        """
+        The slowest statements of this run, slowest first.
+        """
+        slowest = sorted(self.records, key=lambda r: r["seconds"], reverse=True)
+        return [{"query": r["query"][:200], "seconds": r["seconds"],
+                 "rows": r["rows"]} for r in slowest[:size]]
+
+    def close(self):
+        self._cursor.close()
+        if not self.records:
+            return
+        total = sum(r["seconds"] for r in self.records)
+        slowest = self.summary()
+        self._write({"run": self.run_id, "statements": len(self.records),
+                     "total_seconds": round(total, 6), "slowest": slowest})
+        print(f"{len(self.records)} statements in {total:.2f}s "
+              f"(log: {self.log_path}). Slowest:")
+        for r in slowest[:5]:
+            print(f"  {r['seconds']:8.3f}s  {r['rows']:>9}  {r['query'][:80]}")
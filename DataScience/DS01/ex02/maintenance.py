@@ -0,0 +1,123 @@
+from contextlib import contextmanager
+import time
+
+EVENT_TS = "event_ts(event_time::text)"
+
+
+def table_columns(cur, table):
+    """
+    Column names of a table in their declared order.
+    """
+    cur.execute("""
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = %s
+        ORDER BY ordinal_position;
+    """, (table,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def index_plan(cur, stage, table, table2=None, key=None):
+    """
+    Indexes that serve the queries of a stage, as
+    (name, table, definition, transient) tuples.
+
+    - dedup: the PARTITION BY columns followed by event_time, so both
+      window queries can read rows already grouped and ordered.
+    - fusion: the lookup key on both tables, for the JOIN, the
+      ROW_NUMBER() per key and the batched IN (...) updates.
+    - analytics: partial covering indexes on purchases, kept for the
+      charts and the RFM features.
+    """
+    if stage == "dedup":
+        cols = [c for c in table_columns(cur, table) if c != "event_time"]
+        return [(f"idx_{table}_dedup", table,
+                 f"({', '.join(cols + ['event_time'])})", True)]
+    if stage == "fusion":
+        return [(f"idx_{table2}_{key}", table2, f"({key})", True),
+                (f"idx_{table}_{key}", table, f"({key})", True)]
+    if stage == "analytics":
+        return [(f"idx_{table}_purchase_time", table,
+                 "(event_time) INCLUDE (price, user_id) "
+                 "WHERE event_type = 'purchase'", False),
+                (f"idx_{table}_purchase_user", table,
+                 "(user_id) INCLUDE (price, event_time) "
+                 "WHERE event_type = 'purchase'", False)]
+    raise ValueError(f"Unknown stage '{stage}'. Choose dedup, fusion or analytics.")
+
+
+def create_event_ts_function(cur):
+    """
+    Create event_ts(text), the immutable cast of event_time to timestamptz.
+
+    event_time is loaded as text, and a text to timestamptz cast is only
+    stable (it reads the session TimeZone), so Postgres refuses it in an
+    index expression. The event_time strings carry their own zone
+    ('... UTC'), which makes the wrapper safe to declare immutable.
+    Indexes and queries must both use EVENT_TS for the index to match.
+    """
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION event_ts(text) RETURNS timestamptz
+        LANGUAGE sql IMMUTABLE
+        AS $$ SELECT $1::timestamptz $$;
+    """)
+
+
+def create_indexes(cur, plan):
+    """
+    Create the planned indexes and return the time spent on each.
+    """
+    timings = {}
+    for name, table, definition, _ in plan:
+        start = time.perf_counter()
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition};")
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def drop_indexes(cur, names):
+    """
+    Drop indexes that were only needed during a stage.
+    """
+    start = time.perf_counter()
+    for name in names:
+        cur.execute(f"DROP INDEX IF EXISTS {name};")
+    return time.perf_counter() - start
+
+
+def analyze_tables(cur, tables):
+    """
+    Refresh planner statistics of the given tables.
+    """
+    start = time.perf_counter()
+    for table in tables:
+        cur.execute(f"ANALYZE {table};")
+    return time.perf_counter() - start
+
+
+@contextmanager
+def maintained(cur, stage, table, table2=None, key=None):
+    """
+    Prepare the tables for a stage and clean up after it:
+    create the stage indexes, ANALYZE, run the stage, drop the transient
+    indexes and ANALYZE the tables the stage changed.
+    Prints the time of every step.
+    """
+    tables = [t for t in (table, table2) if t]
+    plan = index_plan(cur, stage, table, table2, key)
+    report = {}
+    created = create_indexes(cur, plan)
+    report.update({f"create {name}": s for name, s in created.items()})
+    report["analyze before"] = analyze_tables(cur, tables)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        report[f"stage {stage}"] = time.perf_counter() - start
+        transient = [name for name, _, _, is_transient in plan if is_transient]
+        report["drop transient indexes"] = drop_indexes(cur, transient)
+        if stage != "analytics":
+            report["analyze after"] = analyze_tables(cur, tables)
+        for step, seconds in report.items():
+            print(f"  {step:<40} {seconds:8.2f}s")
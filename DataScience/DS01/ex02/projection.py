@@ -0,0 +1,126 @@
+PROJECTION_COLUMNS = "event_time, price, user_id"
+
+
+def projection_name(table):
+    """
+    Name of the purchase projection of a table.
+    """
+    return f"{table}_purchases"
+
+
+def table_exists(cur, table):
+    cur.execute("SELECT to_regclass(%s)", (table,))
+    return cur.fetchone()[0] is not None
+
+
+def source_marker(cur, table):
+    """
+    Oid of the table: it changes whenever the table is dropped and
+    recreated, as every CSV load and join does.
+    """
+    cur.execute("SELECT to_regclass(%s)::oid", (table,))
+    oid = cur.fetchone()[0]
+    return None if oid is None else str(oid)
+
+
+def projection_marker(cur, table):
+    """
+    Source marker stored with the projection when it was built,
+    or None if there is no projection.
+    """
+    projection = projection_name(table)
+    if not table_exists(cur, projection):
+        return None
+    cur.execute("SELECT obj_description(%s::regclass, 'pg_class')", (projection,))
+    return cur.fetchone()[0]
+
+
+def rebuild_purchases(cur, table):
+    """
+    Rebuild the compact purchase-only copy of a table: event_time, price
+    and user_id of every purchase, stored in event_time order with a BRIN
+    index on event_time. The oid of the table is kept as the comment of
+    the projection.
+    """
+    projection = projection_name(table)
+    print(f"Building purchase projection '{projection}'... please wait")
+    cur.execute(f"""
+        DROP TABLE IF EXISTS {projection};
+        CREATE TABLE {projection} AS
+        SELECT {PROJECTION_COLUMNS}
+        FROM {table}
+        WHERE event_type = 'purchase'
+        ORDER BY event_time;
+        CREATE INDEX {projection}_time_brin ON {projection}
+            USING BRIN (event_time);
+        ANALYZE {projection};
+    """)
+    cur.execute(f"COMMENT ON TABLE {projection} IS %s", (source_marker(cur, table),))
+    print(f"Projection '{projection}' ready.")
+
+
+def append_purchases(cur, table):
+    """
+    Append to the projection the purchases newer than its latest row.
+    """
+    projection = projection_name(table)
+    cur.execute(f"""
+        INSERT INTO {projection} ({PROJECTION_COLUMNS})
+        SELECT {PROJECTION_COLUMNS}
+        FROM {table}
+        WHERE event_type = 'purchase'
+          AND event_time > (SELECT MAX(event_time) FROM {projection})
+        ORDER BY event_time;
+    """)
+    print(f"Appended {cur.rowcount} purchases to '{projection}'.")
+    cur.execute(f"ANALYZE {projection};")
+
+
+def refresh_purchases(cur, table, rebuild=False):
+    """
+    Keep the projection in sync with its table. Called by the stages that
+    write the table (load/join, dedup), never on the read path.
+
+    Rebuilds when asked (e.g. after dedup removed rows), when the
+    projection is missing, was built from an earlier version of the table
+    (another oid) or is out of sync; appends when the table only gained
+    purchases newer than the projection; otherwise leaves it.
+    """
+    projection = projection_name(table)
+    if rebuild or projection_marker(cur, table) != source_marker(cur, table):
+        rebuild_purchases(cur, table)
+        return
+
+    cur.execute(f"SELECT COUNT(*), MAX(event_time) FROM {projection}")
+    proj_count, proj_max = cur.fetchone()
+    cur.execute(f"""
+        SELECT COUNT(*),
+               COUNT(*) FILTER (WHERE event_time > %s)
+        FROM {table}
+        WHERE event_type = 'purchase'
+    """, (proj_max,))
+    count, newer = cur.fetchone()
+
+    if count == proj_count:
+        return
+    if proj_max is not None and count - newer == proj_count:
+        append_purchases(cur, table)
+    else:
+        rebuild_purchases(cur, table)
+
+
+def purchase_source(cur, table):
+    """
+    Where to read the purchases of a table from: its projection when it
+    was built from the current table, otherwise the table itself filtered
+    on event_type. Only the stored oid is compared, the table is not read.
+    Returns (relation, condition).
+    """
+    projection = projection_name(table)
+    marker = projection_marker(cur, table)
+    if marker is not None and marker == source_marker(cur, table):
+        return projection, "TRUE"
+    if marker is not None:
+        print(f"Projection '{projection}' is from an earlier load of '{table}', "
+              f"reading the table instead.")
+    return table, "event_type = 'purchase'"
@@ -3,9 +3,14 @@ import psycopg2
 import os
 import pandas as pd
 from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor
+import time
 import sys
 sys.path.append("../ex01")
 from customers_table import load_env_vars, connect_db
+from maintenance import (maintained, create_event_ts_function, create_indexes,
+                         drop_indexes, analyze_tables, EVENT_TS)
+from projection import refresh_purchases, projection_name
 
 
 def get_columns(cur, table):
@@ -114,15 +119,176 @@ def delete_temporal_duplicated(cur, table1):
     for i in tqdm(range(0, total, batch_size)):
         batch = ctids_to_delete[i:i+batch_size]
         ctids_str = ','.join(f"'{ctid}'" for ctid in batch)
-        delete_query = f"DELETE FROM customers WHERE ctid IN ({ctids_str});"
+        delete_query = f"DELETE FROM {table1} WHERE ctid IN ({ctids_str});"
         cur.execute(delete_query)
 
     print("Temporal duplicates removed.")
 
 
-def select_table(cur):
+def month_partitions(cur, table):
+    """
+    The (start, end) bounds of every month present in a table.
+    Rows without an event_time belong to no month.
+    """
+    cur.execute(f"""
+        SELECT month, month + INTERVAL '1 month'
+        FROM (
+            SELECT DISTINCT date_trunc('month', {EVENT_TS}) AS month
+            FROM {table}
+            WHERE event_time IS NOT NULL
+        ) AS months
+        ORDER BY month;
+    """)
+    return cur.fetchall()
+
+
+def delete_exact_in_partition(db_config, table, columns, start, end):
+    """
+    Delete the exact duplicates of one month on its own connection,
+    in a single server-side statement.
+    Exact duplicates share their event_time, so they never span months.
+    """
+    conn, cur = connect_db(db_config)
+    began = time.perf_counter()
+    try:
+        cur.execute(f"""
+            DELETE FROM {table}
+            WHERE ctid IN (
+                SELECT ctid FROM (
+                    SELECT ctid,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY {", ".join(columns)}
+                            ORDER BY ctid
+                        ) AS rn
+                    FROM {table}
+                    WHERE {EVENT_TS} >= %s
+                      AND {EVENT_TS} < %s
+                ) AS duplicates
+                WHERE rn > 1
+            );
+        """, (start, end))
+        return cur.rowcount, time.perf_counter() - began
+    finally:
+        cur.close()
+        conn.close()
+
+
+def find_temporal_in_partition(db_config, table, columns, start, end):
+    """
+    Find the temporal duplicates of one month on its own connection.
+
+    The scan also reads the last second of the previous month, so an event
+    at the start of the month is compared with the event right before it
+    even when that one belongs to the previous partition (boundary window).
+    Only rows of the month itself are returned.
+    Returns (ctids, boundary_count, seconds).
+    """
+    partition_cols = [col for col in columns if col != "event_time"]
+    partition_by = ", ".join(partition_cols)
+    not_null = " AND ".join(f"{col} IS NOT NULL" for col in partition_cols)
+    conn, cur = connect_db(db_config)
+    began = time.perf_counter()
+    try:
+        cur.execute(f"""
+            SELECT ctid, previous_ts < %s
+            FROM (
+                SELECT ctid,
+                    event_time::timestamptz AS ts,
+                    LAG(event_time::timestamptz) OVER (
+                        PARTITION BY {partition_by}
+                        ORDER BY event_time::timestamptz
+                    ) AS previous_ts
+                FROM {table}
+                WHERE {EVENT_TS} >= %s - INTERVAL '1 second'
+                  AND {EVENT_TS} < %s
+                  AND {not_null}
+            ) AS ranked
+            WHERE ts >= %s
+              AND ts <= previous_ts + INTERVAL '1 second';
+        """, (start, start, end, start))
+        rows = cur.fetchall()
+        ctids = [row[0] for row in rows]
+        boundary = sum(1 for row in rows if row[1])
+        return ctids, boundary, time.perf_counter() - began
+    finally:
+        cur.close()
+        conn.close()
+
+
+def delete_ctids(db_config, table, ctids):
+    """
+    Delete rows by ctid on its own connection.
+    """
+    if not ctids:
+        return 0, 0.0
+    conn, cur = connect_db(db_config)
+    began = time.perf_counter()
+    try:
+        cur.execute(f"DELETE FROM {table} WHERE ctid = ANY(%s::tid[]);", (ctids,))
+        return cur.rowcount, time.perf_counter() - began
+    finally:
+        cur.close()
+        conn.close()
+
+
+def dedup_by_month(db_config, cur, table, n_workers=4):
+    """
+    Remove exact and temporal duplicates month by month, each month on
+    its own connection, n_workers months at a time.
+
+    1. exact duplicates are deleted per month;
+    2. temporal duplicates are searched per month, boundary window included;
+    3. only once every month has been searched are they deleted, so no
+       partition reads rows another one already removed.
+
+    Gives the same result as delete_exact_duplicates followed by
+    delete_temporal_duplicated, and prints the time spent on each month.
+    A transient index on EVENT_TS lets every month read only its own rows
+    instead of scanning the whole table.
+    Returns the per-month report.
+    """
+    columns = get_columns(cur, table)
+    create_event_ts_function(cur)
+    index = f"idx_{table}_event_ts"
+    create_indexes(cur, [(index, table, f"({EVENT_TS})", True)])
+    analyze_tables(cur, [table])
+    try:
+        months = month_partitions(cur, table)
+        print(f"Deduplicating {len(months)} monthly partitions of '{table}' "
+              f"with {n_workers} connections...")
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            exact = list(pool.map(
+                lambda m: delete_exact_in_partition(db_config, table, columns, *m),
+                months))
+            found = list(pool.map(
+                lambda m: find_temporal_in_partition(db_config, table, columns, *m),
+                months))
+            deleted = list(pool.map(
+                lambda f: delete_ctids(db_config, table, f[0]), found))
+    finally:
+        drop_indexes(cur, [index])
+
+    report = []
+    print(f"{'month':<10}{'exact':>10}{'temporal':>10}{'boundary':>10}"
+          f"{'exact s':>10}{'search s':>10}{'delete s':>10}")
+    for (start, _), (n_exact, t_exact), (_, boundary, t_find), (n_temp, t_del) \
+            in zip(months, exact, found, deleted):
+        month = start.strftime("%Y-%m")
+        report.append({"month": month, "exact": n_exact, "temporal": n_temp,
+                       "boundary": boundary, "exact_seconds": t_exact,
+                       "search_seconds": t_find, "delete_seconds": t_del})
+        print(f"{month:<10}{n_exact:>10}{n_temp:>10}{boundary:>10}"
+              f"{t_exact:>10.2f}{t_find:>10.2f}{t_del:>10.2f}")
+    print(f"Removed {sum(r['exact'] for r in report)} exact and "
+          f"{sum(r['temporal'] for r in report)} temporal duplicates.")
+    return report
+
+
+def select_table(cur, table=None):
     """
     List all tables in the public schema and let the user select one.
+    Purchase projections ('<table>_purchases') are not listed.
+    If 'table' is given it is checked and returned without prompting.
     Returns the chosen table name.
     """
     cur.execute("""
@@ -130,10 +296,16 @@ def select_table(cur):
         FROM pg_tables
         WHERE schemaname = 'public';
     """) 
-    tables = [row[0] for row in cur.fetchall()]
+    all_tables = {row[0] for row in cur.fetchall()}
+    projections = {projection_name(t) for t in all_tables}
+    tables = sorted(all_tables - projections)
     if not tables:
         print("No tables found in the database.")
         return None
+    if table is not None:
+        if table not in tables:
+            raise ValueError(f"Table '{table}' not found in the database.")
+        return table
     for i, table in enumerate(tables, start = 1):
         print(f"Table {i} : {table}")
     
@@ -153,6 +325,7 @@ def main():
     """
     Main function to process all CSV files
     in a folder and import them into PostgreSQL.
+    With --parallel, each month is deduplicated on its own connection.
     """
     env_path = "../ex00/.env"
     db_config = load_env_vars(env_path)
@@ -161,8 +334,13 @@ def main():
     table1 = select_table(cur)
     print(f"You selected: {table1}")
     try:
-        delete_exact_duplicates(cur,  table1)
-        delete_temporal_duplicated(cur, table1)
+        with maintained(cur, "dedup", table1):
+            if "--parallel" in sys.argv:
+                dedup_by_month(db_config, cur, table1)
+            else:
+                delete_exact_duplicates(cur,  table1)
+                delete_temporal_duplicated(cur, table1)
+        refresh_purchases(cur, table1, rebuild=True)
     finally:
         cur.close()
         conn.close()
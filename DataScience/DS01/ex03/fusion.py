@@ -8,6 +8,7 @@ sys.path.append("../ex01")
 from customers_table import load_env_vars, connect_db, get_pg_type, create_table_from_df, insert_csv_data, process_csv_file, select_folder
 sys.path.append("../ex02")
 from remove_duplicates import select_table, get_columns
+from maintenance import maintained
 
 
 def add_missing_columns_from_items(cur, table1, table2):
@@ -151,13 +152,19 @@ def keep_most_complete_per_key(cur, table, key_col):
     print(f"✅ Table {table} cleaned: only the most complete row per {key_col} kept.")
 
 
-def choose_column(common_cols, instruction: str):
+def choose_column(common_cols, instruction: str, column=None):
     """
     Let the user choose a column from a set of columns.
     Converts the set to a sorted list to ensure consistent ordering.
+    If 'column' is given it is checked and returned without prompting.
     """
     cols_list = sorted(list(common_cols))
 
+    if column is not None:
+        if column not in cols_list:
+            raise ValueError(f"Column '{column}' not in {cols_list}")
+        return column
+
     if len(cols_list) == 1:
         return cols_list[0]
 
@@ -199,9 +206,10 @@ def find_common_key(cur, table1, table2):
 
     return common_cols
 
-def select_and_proccess_tables(cur, csv_folder):
+def select_and_proccess_tables(cur, csv_folder, table=None):
     """
     Process CSV files in the folder and let the user select one table.
+    If 'table' is given it is used instead of prompting.
     """
     table_names = []
     for filename in os.listdir(csv_folder):
@@ -213,7 +221,11 @@ def select_and_proccess_tables(cur, csv_folder):
         print("⚠ No tables found in the folder.")
         return None, []
 
-    if len(table_names) == 1:
+    if table is not None:
+        if table not in table_names:
+            raise ValueError(f"Table '{table}' not found in '{csv_folder}'.")
+        table2 = table
+    elif len(table_names) == 1:
         table2 = table_names[0]
     else:
         print("Multiple tables found:")
@@ -257,9 +269,10 @@ def main():
 
         common_cols = find_common_key(cur, table1, table2)
         common_col = choose_column(common_cols, "Choose the column to use as key for lookup: ")
-        keep_most_complete_per_key(cur, table2, common_col)
-        missing_cols = add_missing_columns_from_items(cur, table1, table2)
-        look_up(cur, missing_cols, common_col, table1, table2)
+        with maintained(cur, "fusion", table1, table2, common_col):
+            keep_most_complete_per_key(cur, table2, common_col)
+            missing_cols = add_missing_columns_from_items(cur, table1, table2)
+            look_up(cur, missing_cols, common_col, table1, table2)
 
     finally:
         cur.close()
@@ -0,0 +1,131 @@
+import matplotlib
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+import time
+import sys
+
+sys.path.append("../../DS01/ex01")
+from customers_table import load_env_vars, connect_db
+sys.path.append("../ex00")
+from pie import plot_pie_chart, get_data_from_column
+sys.path.append("../ex01")
+from chart import table_to_dataframe, plot_line_chart, plot_histogram_chart, plot_area_chart
+sys.path.append("../ex02")
+from mustache import plot_box_chart, plot_q_box_chart, plot_avg_box_chart
+sys.path.append("../ex03")
+from building import plot_price_histogram, plot_event_histogram
+sys.path.append("../ex05")
+from figure_export import export_figure
+
+DATA = {}
+
+
+def build_jobs(pie_columns):
+    """
+    List every chart to render as (name, function, data key).
+    """
+    jobs = [
+        ("line_chart", plot_line_chart, "purchases"),
+        ("histogram_chart", plot_histogram_chart, "purchases"),
+        ("area_chart", plot_area_chart, "purchases"),
+        ("box_chart", plot_box_chart, "prices"),
+        ("q_box_chart", plot_q_box_chart, "prices"),
+        ("avg_box_chart", plot_avg_box_chart, "purchases"),
+        ("event_histogram", plot_event_histogram, "purchases"),
+        ("price_histogram", plot_price_histogram, "purchases"),
+    ]
+    for col in pie_columns:
+        jobs.append((f"pie_{col}", plot_pie_chart, f"pie:{col}"))
+    return jobs
+
+
+def load_data(conn, cur, table, pie_columns):
+    """
+    Query the database once for everything the charts need.
+    """
+    df = table_to_dataframe(cur, table)
+    data = {"purchases": df, "prices": df['price'].astype(float)}
+    for col in pie_columns:
+        data[f"pie:{col}"] = get_data_from_column(conn, cur, col, table)
+    return data
+
+
+def init_worker(data):
+    """
+    Keep the loaded data in the worker for all the charts it renders.
+    """
+    DATA.update(data)
+
+
+def render_job(job, table, out_dir, formats):
+    """
+    Worker: draw one chart off-screen, save it and return
+    (name, paths, seconds).
+    """
+    name, func, key = job
+    start = time.perf_counter()
+    data = DATA[key]
+    if key.startswith("pie:"):
+        fig = func(data, key[len("pie:"):], table, show=False)
+    else:
+        fig = func(data.copy(), show=False)
+    if fig is None:
+        return name, [], time.perf_counter() - start
+    paths = export_figure(fig, out_dir, name, formats)
+    plt.close(fig)
+    return name, paths, time.perf_counter() - start
+
+
+def render_all(data, table, out_dir, pie_columns=(), formats=("png",),
+               n_jobs=None):
+    """
+    Render every DS02 chart in parallel worker processes.
+    The data is sent once to each worker and shared by all its charts.
+    """
+    jobs = build_jobs(pie_columns)
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=init_worker,
+                             initargs=(data,)) as pool:
+        futures = [pool.submit(render_job, job, table, out_dir, formats)
+                   for job in jobs]
+        results = [f.result() for f in futures]
+
+    for name, paths, seconds in results:
+        status = ", ".join(paths) if paths else "skipped"
+        print(f"{name}: {seconds:.2f}s -> {status}")
+    return results
+
+
+def main():
+    """
+    Render all DS02 charts of a table to an output directory,
+    without any window or prompt.
+
+    Usage: python render_charts.py <table> <out_dir> [pie columns...]
+    """
+    if len(sys.argv) < 3:
+        raise ValueError("Usage: python render_charts.py <table> <out_dir> [pie columns...]")
+
+    table, out_dir = sys.argv[1], sys.argv[2]
+    pie_columns = sys.argv[3:] or ["event_type"]
+
+    env_path = "../../DS01/ex00/.env"
+    db_config = load_env_vars(env_path)
+    conn, cur = connect_db(db_config)
+    try:
+        start = time.perf_counter()
+        data = load_data(conn, cur, table, pie_columns)
+        print(f"Data loaded in {time.perf_counter() - start:.2f}s")
+    finally:
+        cur.close()
+        conn.close()
+        print("Database connection closed.")
+
+    start = time.perf_counter()
+    render_all(data, table, out_dir, pie_columns, formats=("png", "svg"))
+    print(f"All charts rendered in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
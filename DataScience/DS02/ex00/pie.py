@@ -37,26 +37,32 @@ def get_data_from_column(conn, cur, col, table):
         FROM {table}
         GROUP BY {col}
     """
-    df = pd.read_sql(query, conn)
+    cur.execute(query)
+    df = pd.DataFrame(cur.fetchall(), columns=[col, "count"])
     return df
 
 
-def plot_pie_chart(df, col_name: str, table: str):
+def plot_pie_chart(df, col_name: str, table: str, show=True):
     """
     Plot a pie chart showing the distribution of values in a column.
     """
     values = df[col_name]
     counts = df["count"]
     if len(values) > max_unique:
+        if not show:
+            print(f"Skipping column '{col_name}': {len(values)} unique values.")
+            return None
         choice = input(f"Column '{col_name}' has {len(values)} unique values. "
                    "Plot anyway? (y/n): ").lower()
         if choice != 'y':
             return 
 
-    plt.figure(figsize=(8, 8))
+    fig = plt.figure(figsize=(8, 8))
     plt.pie(counts, labels=values, autopct="%1.1f%%", startangle=90)
     plt.title(f"Distribution of values in '{col_name}' (Table {table})")
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 
 def main():
@@ -10,12 +10,14 @@ sys.path.append("../../DS01/ex01")
 from customers_table import load_env_vars, connect_db
 sys.path.append("../../DS01/ex02")
 from remove_duplicates import select_table
+from projection import purchase_source
 REQUIRED_COLUMNS = {"event_time", "event_type", "price", "user_id"}
 
 def table_to_dataframe(cur, table):
     """
     Load only required columns from the table using psycopg2 cursor
     and convert to DataFrame.
+    Purchases are read from the table's purchase projection when it exists.
     """
     cur.execute("""
         SELECT column_name 
@@ -29,10 +31,11 @@ def table_to_dataframe(cur, table):
     if missing:
         raise ValueError(f"Table '{table}' is missing required columns: {', '.join(missing)}")
 
+    source, condition = purchase_source(cur, table)
     query = f"""
-        SELECT event_time, event_type, price, user_id
-        FROM {table}
-        WHERE event_type = 'purchase'
+        SELECT event_time, 'purchase' AS event_type, price, user_id
+        FROM {source}
+        WHERE {condition}
     """
 
     cur.execute(query)
@@ -46,7 +49,7 @@ def table_to_dataframe(cur, table):
 
 
 
-def plot_line_chart(df):
+def plot_line_chart(df, show=True):
     """
     Plot a line chart showing unique users per month.
     """
@@ -54,7 +57,7 @@ def plot_line_chart(df):
     df_count = df.groupby(df['event_time'].dt.date)['user_id'].nunique().reset_index()
     df_count.rename(columns={'event_time': 'date', 'user_id': 'unique_users'}, inplace=True)
 
-    plt.figure(figsize=(12, 6))
+    fig = plt.figure(figsize=(12, 6))
     plt.plot(df_count['date'], df_count['unique_users'])
 
     plt.ylabel("Number of customers")
@@ -65,11 +68,13 @@ def plot_line_chart(df):
 
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 
 
-def plot_histogram_chart(df):
+def plot_histogram_chart(df, show=True):
     """
     Plot an histogram chart showing total sales in millions per month.
     """
@@ -78,16 +83,18 @@ def plot_histogram_chart(df):
     df_sum = df.groupby('year_month')['price'].sum().reset_index()
     df_sum['price'] = df_sum['price'] / 1_000_000
 
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
     plt.bar(df_sum['year_month'].astype(str), df_sum['price'], color='skyblue')
     plt.ylabel("Total sales in millions")
     plt.title("Monthly Sales Histogram")
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 
-def plot_area_chart(df):
+def plot_area_chart(df, show=True):
     """
     Plot an area chart showing average revenue per user (ARPU) per day,
     """
@@ -103,7 +110,7 @@ def plot_area_chart(df):
     df_avg = pd.merge(df_price, df_userid, on='date')
     df_avg['ARPU'] = df_avg['total_sales'] / df_avg['unique_users']
 
-    plt.figure(figsize=(12, 6))
+    fig = plt.figure(figsize=(12, 6))
     plt.fill_between(df_avg['date'], df_avg['ARPU'], color='skyblue', alpha=0.5)
     plt.plot(df_avg['date'], df_avg['ARPU'], color='blue')
     plt.ylabel("Average spend/customers")
@@ -114,7 +121,9 @@ def plot_area_chart(df):
     plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
    
 
@@ -10,7 +10,7 @@ sys.path.append("../../DS01/ex01")
 from customers_table import load_env_vars, connect_db
 sys.path.append("../../DS01/ex02")
 from remove_duplicates import select_table
-sys.path.append("../../DS01/ex01")
+sys.path.append("../../DS02/ex01")
 from chart import table_to_dataframe
 
 def mean(data):
@@ -44,10 +44,10 @@ def maxi(data):
     return data[len(data) - 1]
     
 
-def plot_avg_box_chart(df_purchases):
+def plot_avg_box_chart(df_purchases, show=True):
     avg_per_user = df_purchases.groupby('user_id')['price'].mean()
 
-    plt.figure(figsize=(4, 4))
+    fig = plt.figure(figsize=(4, 4))
     plt.boxplot(avg_per_user, vert=False,
             patch_artist=True,
             boxprops=dict(facecolor='blue', alpha=0.5),
@@ -55,11 +55,13 @@ def plot_avg_box_chart(df_purchases):
             showfliers=False)
     plt.xlabel("Average basket price")
     plt.title('Box plot of purchased item prices')
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 
-def plot_q_box_chart(series):
-    plt.figure(figsize=(4, 4))
+def plot_q_box_chart(series, show=True):
+    fig = plt.figure(figsize=(4, 4))
     plt.boxplot(series, vert=False,
             patch_artist=True,
             boxprops=dict(facecolor='green', color='green', alpha=0.5),
@@ -67,15 +69,19 @@ def plot_q_box_chart(series):
             showfliers=False)
     plt.xlabel('Price')
     plt.title('Box plot of purchased item prices')
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 
-def plot_box_chart(series):
-    plt.figure(figsize=(4, 4))
+def plot_box_chart(series, show=True):
+    fig = plt.figure(figsize=(4, 4))
     plt.boxplot(series, vert=False)
     plt.xlabel('Price')
     plt.title('Box plot of purchased item prices')
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 def main():
     """
@@ -12,32 +12,36 @@ from remove_duplicates import select_table
 sys.path.append("../../DS02/ex01")
 from chart import table_to_dataframe
 
-def plot_price_histogram(df):
+def plot_price_histogram(df, show=True):
     """
     Plot bar chart of total Altairian Dollars spent per user.
     """
     df_spent_per_user = df.groupby(df['user_id'])['price'].sum().reset_index()
 
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
     plt.hist(df_spent_per_user['price'], bins=range(0, 251, 50), edgecolor='black')
     plt.xlabel("Monetary value")
     plt.ylabel("Customerss")
     plt.title("Spent per user")
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 
-def plot_event_histogram(df):
+def plot_event_histogram(df, show=True):
     """
     Plot histogram of number of events per user.
     """
     events_per_user = df['user_id'].value_counts()
 
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
     plt.hist(events_per_user, bins=range(0, 41, 10), edgecolor='black')
     plt.xlabel("Frequency")
     plt.ylabel("Customerss")
     plt.title("Events per client distribution")
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 
 def main():
@@ -4,6 +4,11 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import time
 
 import sys
 import os
@@ -11,52 +16,129 @@ sys.path.append("../../DS01/ex01")
 from customers_table import load_env_vars, connect_db
 sys.path.append("../../DS01/ex02")
 from remove_duplicates import select_table
+from feature_store import load_user_features, FEATURE_COLUMNS
 
-REQUIRED_COLUMNS = {"event_time", "event_type", "price", "user_id"}
+def fit_inertia(shm_name, shape, dtype, k, n_threads):
+    """
+    Worker: fit KMeans for one k on the matrix stored in shared memory
+    and return (k, inertia, seconds).
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        X_scaled = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        start = time.perf_counter()
+        with threadpool_limits(limits=n_threads):
+            kmeans = KMeans(n_clusters=k, random_state=42)
+            kmeans.fit(X_scaled)
+        return k, kmeans.inertia_, time.perf_counter() - start
+    finally:
+        shm.close()
 
 
-def table_to_dataframe(cur, table):
+def elbow_sweep(X_scaled, k_values=range(1, 10), n_jobs=None):
     """
-    Load only required columns from the table using psycopg2 cursor
-    and convert to DataFrame.
+    Fit KMeans for every k in a process pool.
+
+    The scaled matrix is copied once into shared memory, and every worker
+    maps it instead of receiving a pickled copy.
+    Returns the inertia curve and the time spent on each k.
     """
-    cur.execute("""
-        SELECT column_name 
-        FROM information_schema.columns 
-        WHERE table_name = %s
-    """, (table,))
+    X_scaled = np.ascontiguousarray(X_scaled, dtype=np.float64)
+    k_values = list(k_values)
+    n_jobs = n_jobs or min(len(k_values), os.cpu_count() or 1)
+    n_threads = max(1, (os.cpu_count() or 1) // n_jobs)
+
+    shm = shared_memory.SharedMemory(create=True, size=X_scaled.nbytes)
+    try:
+        shared = np.ndarray(X_scaled.shape, dtype=X_scaled.dtype,
+                            buffer=shm.buf)
+        shared[:] = X_scaled
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(fit_inertia, shm.name, X_scaled.shape,
+                                   X_scaled.dtype.str, k, n_threads)
+                       for k in k_values]
+            results = [f.result() for f in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    inertia = [inertia for _, inertia, _ in results]
+    timings = [seconds for _, _, seconds in results]
+    return inertia, timings
+
 
-    available_columns = {row[0] for row in cur.fetchall()}
+def next_seed(X_scaled, sq_norms, closest_sq, rng, n_candidates):
+    """
+    Pick one new centre the k-means++ way: sample candidates with
+    probability proportional to their squared distance to the closest
+    existing centre and keep the one that lowers the potential most.
+    """
+    probs = closest_sq / closest_sq.sum()
+    candidates = X_scaled[rng.choice(len(X_scaled), size=n_candidates, p=probs)]
+    dist_sq = (sq_norms[:, None] - 2 * X_scaled @ candidates.T
+               + (candidates ** 2).sum(axis=1))
+    potentials = np.minimum(closest_sq[:, None], dist_sq).sum(axis=0)
+    return candidates[np.argmin(potentials)]
 
-    missing = set(REQUIRED_COLUMNS) - available_columns
-    if missing:
-        raise ValueError(f"Table '{table}' is missing required columns: {', '.join(missing)}")
 
-    query = f"""
-        SELECT event_time, event_type, price, user_id
-        FROM {table}
+def warm_elbow_sweep(X_scaled, k_values=range(1, 10), seed=42):
     """
+    Compute the elbow curve incrementally.
 
-    cur.execute(query)
-    rows = cur.fetchall()
-    df = pd.DataFrame(rows, columns=['event_time', 'event_type', 'price', 'user_id'])
+    Each k starts from the k-1 centroids plus one new k-means++ seed and
+    runs a single Lloyd fit, so every fit starts close to convergence
+    instead of from a fresh random initialisation.
+    Returns the inertia curve and the time spent on each k.
+    """
+    X_scaled = np.asarray(X_scaled, dtype=np.float64)
+    k_values = list(k_values)
+    rng = np.random.default_rng(seed)
+
+    sq_norms = np.einsum("ij,ij->i", X_scaled, X_scaled)
+    centers = X_scaled.mean(axis=0, keepdims=True)
+    diff = X_scaled - centers
+    closest_sq = np.einsum("ij,ij->i", diff, diff)
+    results = {1: (closest_sq.sum(), 0.0)}
+
+    for k in range(2, max(k_values) + 1):
+        start = time.perf_counter()
+        if closest_sq.sum() == 0:
+            results[k] = (0.0, time.perf_counter() - start)
+            continue
+        n_candidates = 2 + int(np.log(k))
+        new_center = next_seed(X_scaled, sq_norms, closest_sq, rng,
+                               n_candidates)
+        init = np.vstack([centers, new_center])
+        kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=42)
+        kmeans.fit(X_scaled)
+        centers = kmeans.cluster_centers_
+        diff = X_scaled - centers[kmeans.labels_]
+        closest_sq = np.einsum("ij,ij->i", diff, diff)
+        results[k] = (kmeans.inertia_, time.perf_counter() - start)
 
-    if df.empty:
-        raise ValueError(f"No events found in table '{table}'.")
+    inertia = [results[k][0] for k in k_values]
+    timings = [results[k][1] for k in k_values]
+    return inertia, timings
 
-    return df
 
-def plot_elbow(X):
+def plot_elbow(X, method="warm"):
+    """
+    Plot the elbow curve.
+    method="warm" grows the centroids from k-1 to k,
+    method="parallel" fits every k from scratch in a process pool.
+    """
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
-    inertia = []
-    for k in range(1, 10):
-        kmeans = KMeans(n_clusters=k, random_state=42)
-        kmeans.fit(X_scaled)
-        inertia.append(kmeans.inertia_)
+    k_values = range(1, 10)
+    if method == "warm":
+        inertia, timings = warm_elbow_sweep(X_scaled, k_values)
+    else:
+        inertia, timings = elbow_sweep(X_scaled, k_values)
+    for k, seconds in zip(k_values, timings):
+        print(f"k = {k}: {seconds:.2f}s")
 
     plt.figure(figsize=(6, 4))
-    plt.plot(range(1, 10), inertia)
+    plt.plot(k_values, inertia)
     plt.xlabel("Number of clusters")
     plt.ylabel("Inertia")
     plt.title("Elbow Method for optimal k")
@@ -77,20 +159,8 @@ def main():
         conn, cur = connect_db(db_config)
         print("Select the table you want to take data from: ")
         table = select_table(cur)
-        df = table_to_dataframe(cur, table)
-        df['event_time'] = pd.to_datetime(df['event_time'])
-        
-        events_per_user = df[df['event_type'] == 'purchase'].groupby('user_id').size().reset_index(name='num_purchases')
-        spent_per_user = df[df['event_type'] == 'purchase'].groupby(df['user_id'])['price'].sum().reset_index(name='total_spent')
-        last_purchase = df[df['event_type'] == 'purchase'].groupby('user_id')['event_time'].max().reset_index()
-        last_purchase['event_time'] = last_purchase['event_time'].dt.tz_localize(None)
-        last_purchase['days_since_last'] = (pd.Timestamp.now() - last_purchase['event_time']).dt.days
-
-
-        user_stats = events_per_user.merge(spent_per_user, on='user_id', how='outer')\
-                                .merge(last_purchase[['user_id','days_since_last']], on='user_id', how='outer')\
-                                .fillna(0)
-        X = user_stats[['num_purchases', 'total_spent', 'days_since_last']]
+        user_stats = load_user_features(cur, table, pd.Timestamp.now())
+        X = user_stats[FEATURE_COLUMNS]
 
         plot_elbow(X)
        
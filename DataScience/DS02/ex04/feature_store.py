@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "..", "DS01", "ex02"))
+from projection import purchase_source
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "..", ".feature_store")
+FEATURE_COLUMNS = ["num_purchases", "total_spent", "days_since_last"]
+
+
+def get_source_state(cur, table):
+    """
+    Return the number of purchase events and the latest purchase time
+    of the source table. Together they identify the stored matrix.
+    event_time is loaded as text, so it is cast before comparing.
+    """
+    source, condition = purchase_source(cur, table)
+    cur.execute(f"""
+        SELECT COUNT(*), MAX(event_time::timestamptz)
+        FROM {source}
+        WHERE {condition}
+    """)
+    count, max_time = cur.fetchone()
+    if count == 0:
+        raise ValueError(f"No 'purchase' events found in table '{table}'.")
+    return {"row_count": int(count), "max_event_time": max_time.isoformat()}
+
+
+def fetch_user_aggregates(cur, table, since=None):
+    """
+    Aggregate purchases per user on the server side, from the purchase
+    projection when it exists. If 'since' is given, only purchases after that time are aggregated.
+    """
+    source, condition = purchase_source(cur, table)
+    query = f"""
+        SELECT user_id, COUNT(*), SUM(price), MAX(event_time::timestamptz)
+        FROM {source}
+        WHERE {condition}
+    """
+    params = None
+    if since is not None:
+        query += " AND event_time::timestamptz > %s::timestamptz"
+        params = (since,)
+    query += " GROUP BY user_id"
+
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    agg = pd.DataFrame(rows, columns=['user_id', 'num_purchases',
+                                      'total_spent', 'last_purchase'])
+    agg['num_purchases'] = agg['num_purchases'].astype(float)
+    agg['total_spent'] = agg['total_spent'].astype(float)
+    # naive UTC times, whatever the offsets of the session TimeZone
+    agg['last_purchase'] = pd.to_datetime(agg['last_purchase'],
+                                          utc=True).dt.tz_localize(None)
+    return agg
+
+
+def merge_aggregates(stored, delta):
+    """
+    Merge newly aggregated purchases into the stored per-user aggregates.
+    """
+    merged = pd.concat([stored, delta], ignore_index=True)
+    return merged.groupby('user_id', as_index=False).agg(
+        num_purchases=('num_purchases', 'sum'),
+        total_spent=('total_spent', 'sum'),
+        last_purchase=('last_purchase', 'max')
+    )
+
+
+def store_path(table):
+    """
+    Path of the stored feature matrix for a source table.
+    """
+    return os.path.join(STORE_DIR, f"{table}.npz")
+
+
+def save_aggregates(table, agg, state):
+    """
+    Persist per-user aggregates and the source state they were built from.
+    """
+    os.makedirs(STORE_DIR, exist_ok=True)
+    np.savez(
+        store_path(table),
+        user_id=agg['user_id'].to_numpy(dtype=np.int64),
+        num_purchases=agg['num_purchases'].to_numpy(dtype=np.float64),
+        total_spent=agg['total_spent'].to_numpy(dtype=np.float64),
+        last_purchase=agg['last_purchase'].to_numpy(dtype='datetime64[ns]'),
+        row_count=state["row_count"],
+        max_event_time=state["max_event_time"]
+    )
+
+
+def load_aggregates(table):
+    """
+    Load stored aggregates and their source state, or (None, None).
+    """
+    path = store_path(table)
+    if not os.path.exists(path):
+        return None, None
+    with np.load(path) as data:
+        agg = pd.DataFrame({
+            'user_id': data['user_id'],
+            'num_purchases': data['num_purchases'],
+            'total_spent': data['total_spent'],
+            'last_purchase': data['last_purchase']
+        })
+        state = {"row_count": int(data['row_count']),
+                 "max_event_time": str(data['max_event_time'])}
+    return agg, state
+
+
+def user_features(agg, today):
+    """
+    Build the RFM feature frame from per-user aggregates.
+    """
+    user_stats = agg[['user_id', 'num_purchases', 'total_spent']].copy()
+    user_stats['days_since_last'] = (today - agg['last_purchase']).dt.days
+    return user_stats
+
+
+def load_user_features(cur, table, today):
+    """
+    Return per-user num_purchases, total_spent and days_since_last.
+
+    The aggregates are reused when the source table is unchanged,
+    updated with only the new purchases when events were appended,
+    and rebuilt from scratch otherwise.
+    """
+    state = get_source_state(cur, table)
+    agg, stored_state = load_aggregates(table)
+
+    if agg is not None and stored_state == state:
+        print(f"Feature store: reusing stored features for '{table}'.")
+        return user_features(agg, today)
+
+    if (agg is not None
+            and pd.Timestamp(state["max_event_time"])
+            > pd.Timestamp(stored_state["max_event_time"])
+            and state["row_count"] > stored_state["row_count"]):
+        delta = fetch_user_aggregates(cur, table,
+                                      since=stored_state["max_event_time"])
+        new_rows = int(delta['num_purchases'].sum())
+        if new_rows == state["row_count"] - stored_state["row_count"]:
+            print(f"Feature store: adding {new_rows} new purchases "
+                  f"to '{table}'.")
+            agg = merge_aggregates(agg, delta)
+            save_aggregates(table, agg, state)
+            return user_features(agg, today)
+
+    print(f"Feature store: building features for '{table}'... please wait")
+    agg = fetch_user_aggregates(cur, table)
+    save_aggregates(table, agg, state)
+    return user_features(agg, today)
@@ -2,6 +2,7 @@ import psycopg2
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.lines import Line2D
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 import numpy as np
@@ -13,23 +14,34 @@ from customers_table import load_env_vars, connect_db
 sys.path.append("../../DS01/ex02")
 from remove_duplicates import select_table
 sys.path.append("../ex04")
-from elbow import table_to_dataframe
+from feature_store import load_user_features, FEATURE_COLUMNS
+from elbow import elbow_sweep, warm_elbow_sweep
+from minibatch import stratified_sample, minibatch_labels, compare_with_full
+from figure_export import export_figure
 
+LOYALTY_COLORS = {
+    'inactive': '#999999',      # grey
+    'new customer': '#1f77b4',  # blue
+    'silver': '#c0c0c0',        # silver
+    'gold': '#ffd700',          # gold
+    'platinum': '#e5e4e2'       # platinum
+}
 
-def optimal_clusters(X_scaled):
+
+def optimal_clusters(X_scaled, method="warm"):
     """
     Determine the optimal number of clusters using the Elbow Method.
 
     This function calculates the inertia (within-cluster sum of squares)
     for k values ranging from 1 to 9, and then looks for the "elbow point"
     where the inertia stops decreasing significantly.
+    By default each k is warm-started from the k-1 centroids;
+    method="parallel" fits every k from scratch in a process pool.
     """
-    inertia = []
-    K = range(1, 10)
-    for k in K:
-        kmeans = KMeans(n_clusters=k, random_state=42)
-        kmeans.fit(X_scaled)
-        inertia.append(kmeans.inertia_)
+    if method == "warm":
+        inertia, _ = warm_elbow_sweep(X_scaled, range(1, 10))
+    else:
+        inertia, _ = elbow_sweep(X_scaled, range(1, 10))
 
     deltas = np.diff(inertia)
     k_opt = np.argmin(deltas < (0.1 * deltas[0])) + 1
@@ -37,26 +49,39 @@ def optimal_clusters(X_scaled):
     return max(k_opt, 4)
 
 
-def assign_loyalty_groups(user_stats, X_scaled, k_opt):
+def segment_masks(user_stats):
     """
-    Assigns customers to loyalty groups based on purchase behavior.
+    Masks of the inactive and new customers, and of the remaining
+    customers that are clustered.
     """
-    # Step 1: inactive and new customers
     inactive_mask = (user_stats['num_purchases'] > 0) & (user_stats['days_since_last'] >= 90)
     new_mask = (user_stats['num_purchases'] > 0) & (user_stats['days_since_last'] <= 7)
+    return inactive_mask, new_mask, ~(inactive_mask | new_mask)
+
+
+def assign_loyalty_groups(user_stats, X_scaled, k_opt, mode="full"):
+    """
+    Assigns customers to loyalty groups based on purchase behavior.
+    With mode="minibatch" the remaining customers are clustered with
+    MiniBatchKMeans and assigned in chunks instead of a full KMeans fit.
+    """
+    # Step 1: inactive and new customers
+    inactive_mask, new_mask, mask_remaining = segment_masks(user_stats)
 
     user_stats['loyalty_group'] = None
     user_stats.loc[inactive_mask, 'loyalty_group'] = 'inactive'
     user_stats.loc[new_mask, 'loyalty_group'] = 'new customer'
 
     # Step 2: remaining customers (to cluster)
-    mask_remaining = ~(inactive_mask | new_mask)
     remaining = user_stats[mask_remaining].copy()
     X_remaining = X_scaled[mask_remaining]
 
     if len(remaining) > 0 and k_opt > 2:
-        kmeans = KMeans(n_clusters=k_opt - 2, random_state=42)
-        labels = kmeans.fit_predict(X_remaining)
+        if mode == "minibatch":
+            labels = minibatch_labels(X_remaining, k_opt - 2)
+        else:
+            kmeans = KMeans(n_clusters=k_opt - 2, random_state=42)
+            labels = kmeans.fit_predict(X_remaining)
 
         remaining['cluster'] = labels
 
@@ -78,14 +103,39 @@ def assign_loyalty_groups(user_stats, X_scaled, k_opt):
 
     return user_stats
 
-def plot_rfm_groups(user_stats):
+
+def group_colors(groups):
+    """
+    Map loyalty group names to colors in one pass.
+    Dynamic platinum groups (platinum1, platinum2, ...) share the platinum
+    color and unknown groups fall back to skyblue.
+    """
+    groups = pd.Series(groups, dtype=object)
+    colors = groups.map(LOYALTY_COLORS)
+    platinum = groups.str.startswith("platinum", na=False)
+    colors = colors.mask(colors.isna() & platinum, LOYALTY_COLORS['platinum'])
+    return colors.fillna('skyblue').tolist()
+
+
+def get_figure(name, figsize):
+    """
+    Return the figure registered under 'name', cleared for redrawing.
+    The figure object is created once and reused on later renders.
+    """
+    return plt.figure(num=name, figsize=figsize, clear=True)
+
+
+def plot_rfm_groups(user_stats, show=True):
     """
     Plot a bubble chart of loyalty groups: median Recency vs median Frequency.
-    
+    All groups are drawn with a single scatter call.
+
     Parameters
     ----------
     user_stats : pd.DataFrame
         Must contain 'loyalty_group', 'days_since_last', 'num_purchases'.
+    show : bool
+        Display the figure; otherwise only return it.
     """
     summary = user_stats.groupby('loyalty_group').agg(
         median_recency=('days_since_last', 'median'),
@@ -93,115 +143,116 @@ def plot_rfm_groups(user_stats):
         count=('user_id', 'size')
     ).reset_index()
 
-    # Define colors for each group
-    color_map = {
-        'inactive': '#999999',
-        'new customer': '#1f77b4',
-        'silver': '#c0c0c0',
-        'gold': '#ffd700',
-        'platinum': '#e5e4e2'
-    }
-
     max_size = 2000  # tamaño máximo de burbuja
-    summary['size'] = summary['count'] / summary['count'].max() * max_size
-    # Plot
-    plt.figure(figsize=(8,6))
-    for _, row in summary.iterrows():
-        plt.scatter(
-            row['median_recency'],
-            row['median_frequency'],
-            s=row['size'],  # bubble size proportional to number of users
-            color=color_map.get(row['loyalty_group'], 'skyblue'),
-            alpha=0.6,
-            label=row['loyalty_group']
-        )
-
-    plt.xlabel("Median Recency (days since last purchase)")
-    plt.ylabel("Median Frequency (# of purchases)")
-    plt.title("Customer Loyalty Groups: Recency vs Frequency")
-    plt.legend(title="Loyalty Group")
-    plt.grid(True)
-    plt.show()
-
-def plot_loyalty_bars(user_stats):
+    sizes = summary['count'] / summary['count'].max() * max_size
+    colors = group_colors(summary['loyalty_group'])
+
+    fig = get_figure("rfm_groups", (8, 6))
+    ax = fig.gca()
+    ax.scatter(summary['median_recency'], summary['median_frequency'],
+               s=sizes, c=colors, alpha=0.6)
+    handles = [Line2D([], [], marker='o', linestyle='', markersize=10,
+                      color=color, alpha=0.6, label=group)
+               for group, color in zip(summary['loyalty_group'], colors)]
+
+    ax.set_xlabel("Median Recency (days since last purchase)")
+    ax.set_ylabel("Median Frequency (# of purchases)")
+    ax.set_title("Customer Loyalty Groups: Recency vs Frequency")
+    ax.legend(handles=handles, title="Loyalty Group")
+    ax.grid(True)
+    if show:
+        plt.show()
+    return fig
+
+
+def plot_loyalty_bars(user_stats, show=True):
     """
     Plot a horizontal bar chart showing the number of customers
     in each loyalty group, with a distinct color per group.
     """
     counts = user_stats['loyalty_group'].value_counts()
 
-    # Define base colors for known groups
-    color_map = {
-        'inactive': '#999999',      # grey
-        'new customer': '#1f77b4',  # blue
-        'silver': '#c0c0c0',        # silver
-        'gold': '#ffd700',          # gold
-        'platinum': '#e5e4e2'       # platinum
-    }
-
-    # For dynamic platinum groups (platinum1, platinum2, ...)
-    colors = []
-    for group in counts.index:
-        if group in color_map:
-            colors.append(color_map[group])
-        elif group.startswith("platinum"):
-            colors.append('#e5e4e2')  # same platinum color
-        else:
-            colors.append('skyblue')  # fallback
+    fig = get_figure("loyalty_bars", (8, 5))
+    ax = fig.gca()
+    ax.barh(counts.index, counts.values, color=group_colors(counts.index))
+    ax.set_xlabel("Number of Customers")
+    ax.set_ylabel("Customer Group")
+    ax.set_title("Number of Customers per Loyalty Group")
+    fig.tight_layout()
+    if show:
+        plt.show()
+    return fig
 
-    plt.figure(figsize=(8, 5))
-    plt.barh(counts.index, counts.values, color=colors)
-    plt.xlabel("Number of Customers")
-    plt.ylabel("Customer Group")
-    plt.title("Number of Customers per Loyalty Group")
-    plt.tight_layout()
-    plt.show()
 
+def export_segment_plots(segmentations, out_dir, formats=("png", "svg")):
+    """
+    Render the loyalty plots of many segmentations and save them.
+
+    segmentations maps a name to a user_stats frame with 'loyalty_group'.
+    The same two figure objects are redrawn for every segmentation.
+    Select a non-interactive backend first to run without a display.
+    """
+    paths = []
+    for name, user_stats in segmentations.items():
+        fig = plot_loyalty_bars(user_stats, show=False)
+        paths += export_figure(fig, out_dir, f"{name}_loyalty_bars", formats)
+        fig = plot_rfm_groups(user_stats, show=False)
+        paths += export_figure(fig, out_dir, f"{name}_rfm_groups", formats)
+    return paths
 
 
 def main():
+    """
+    Segment customers into loyalty groups and plot them.
+
+    Options:
+        --minibatch  choose k on a stratified sample and assign every
+                     user with MiniBatchKMeans.
+        --compare    with --minibatch, report time and accuracy against
+                     the full KMeans path.
+        --export DIR save the plots as PNG and SVG in DIR
+                     instead of showing them.
+    """
+    mode = "minibatch" if "--minibatch" in sys.argv else "full"
+    out_dir = None
+    if "--export" in sys.argv:
+        i = sys.argv.index("--export") + 1
+        if i >= len(sys.argv) or sys.argv[i].startswith("--"):
+            print("Usage: python Clustering.py [--minibatch [--compare]] [--export DIR]")
+            return
+        out_dir = sys.argv[i]
+        plt.switch_backend("Agg")
     try:
         env_path = "../../DS01/ex00/.env"
         db_config = load_env_vars(env_path)
         conn, cur = connect_db(db_config)
         print("Select the table you want to take data from: ")
         table = select_table(cur)
-        df = table_to_dataframe(cur, table)
-        df['event_time'] = pd.to_datetime(df['event_time'])
-
-
-
-        # purchases por usuario
-        events_per_user = df[df['event_type'] == 'purchase'] \
-                            .groupby('user_id').size().reset_index(name='num_purchases')
-
-        # gasto total
-        spent_per_user = df[df['event_type'] == 'purchase'] \
-                            .groupby('user_id')['price'].sum().reset_index(name='total_spent')
-
-        # última compra
-        last_purchase = df[df['event_type'] == 'purchase'] \
-                            .groupby('user_id')['event_time'].max().reset_index()
-        last_purchase['event_time'] = last_purchase['event_time'].dt.tz_localize(None)
         today = pd.Timestamp("2023-02-1")
-        last_purchase['days_since_last'] = (today - last_purchase['event_time']).dt.days
-
-        # merge con ALL users
-        user_stats = events_per_user\
-            .merge(spent_per_user, on='user_id', how='left') \
-            .merge(last_purchase[['user_id', 'days_since_last']], on='user_id', how='left') \
-            .fillna({'num_purchases': 0, 'total_spent': 0, 'days_since_last': 9999})
+        user_stats = load_user_features(cur, table, today)
 
         # features para clustering
-        X = user_stats[['num_purchases', 'total_spent', 'days_since_last']]
+        X = user_stats[FEATURE_COLUMNS]
         scaler = StandardScaler()
         X_scaled = scaler.fit_transform(X)
 
-        k_opt = optimal_clusters(X_scaled)
-        user_stats = assign_loyalty_groups(user_stats, X_scaled, k_opt)
+        if mode == "minibatch":
+            sample = stratified_sample(X_scaled)
+            print(f"Choosing k on a sample of {len(sample)} users")
+            k_opt = optimal_clusters(X_scaled[sample])
+            if "--compare" in sys.argv:
+                _, _, mask_remaining = segment_masks(user_stats)
+                compare_with_full(X_scaled[mask_remaining.to_numpy()], k_opt - 2)
+        else:
+            k_opt = optimal_clusters(X_scaled)
+        user_stats = assign_loyalty_groups(user_stats, X_scaled, k_opt, mode)
 
-        plot_loyalty_bars(user_stats)
-        plot_rfm_groups(user_stats)
+        if out_dir is not None:
+            paths = export_segment_plots({table: user_stats}, out_dir)
+            print(f"Saved {len(paths)} plots to {out_dir}")
+        else:
+            plot_loyalty_bars(user_stats)
+            plot_rfm_groups(user_stats)
 
     finally:
         cur.close()
@@ -0,0 +1,14 @@
+import os
+
+
+def export_figure(fig, out_dir, name, formats=("png",)):
+    """
+    Save a figure to out_dir as name.<format> for every requested format.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        fig.savefig(path, format=fmt)
+        paths.append(path)
+    return paths
@@ -0,0 +1,109 @@
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import adjusted_rand_score
+import numpy as np
+import time
+
+SAMPLE_SIZE = 100_000
+CHUNK_SIZE = 100_000
+N_BINS = 4
+
+
+def stratified_sample(X_scaled, sample_size=SAMPLE_SIZE, n_bins=N_BINS,
+                      seed=42):
+    """
+    Return the row indices of a stratified sample of X_scaled.
+
+    Every feature is cut into quantile bins, and each combination of bins
+    is a stratum sampled in proportion to its size, so small groups
+    (heavy spenders, very recent buyers) keep their weight in the sample.
+    """
+    n = len(X_scaled)
+    if n <= sample_size:
+        return np.arange(n)
+
+    codes = np.zeros(n, dtype=np.int64)
+    for j in range(X_scaled.shape[1]):
+        edges = np.quantile(X_scaled[:, j], np.linspace(0, 1, n_bins + 1)[1:-1])
+        codes = codes * n_bins + np.searchsorted(edges, X_scaled[:, j])
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(n)
+    order = order[np.argsort(codes[order], kind="stable")]
+    sorted_codes = codes[order]
+
+    strata, starts, counts = np.unique(sorted_codes, return_index=True,
+                                       return_counts=True)
+    quotas = np.maximum(1, np.round(counts * sample_size / n)).astype(int)
+    rank = np.arange(n) - np.repeat(starts, counts)
+    keep = rank < np.repeat(quotas, counts)
+    return np.sort(order[keep])
+
+
+def fit_minibatch(X_scaled, n_clusters, chunk_size=CHUNK_SIZE, seed=42):
+    """
+    Fit MiniBatchKMeans by streaming X_scaled in chunks with partial_fit.
+    Chunks smaller than n_clusters are skipped; if that leaves none,
+    the model is fitted once on all the rows.
+    """
+    if len(X_scaled) < n_clusters:
+        raise ValueError(f"Cannot form {n_clusters} clusters from "
+                         f"{len(X_scaled)} rows.")
+    model = MiniBatchKMeans(n_clusters=n_clusters, random_state=seed,
+                            batch_size=min(chunk_size, 4096), n_init=3)
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(X_scaled))
+    fitted = False
+    for start in range(0, len(order), chunk_size):
+        chunk = X_scaled[np.sort(order[start:start + chunk_size])]
+        if len(chunk) < n_clusters:
+            continue
+        model.partial_fit(chunk)
+        fitted = True
+    if not fitted:
+        model.fit(X_scaled)
+    return model
+
+
+def predict_in_chunks(model, X_scaled, chunk_size=CHUNK_SIZE):
+    """
+    Assign every row to a cluster, one chunk at a time.
+    """
+    labels = np.empty(len(X_scaled), dtype=np.int32)
+    for start in range(0, len(X_scaled), chunk_size):
+        stop = start + chunk_size
+        labels[start:stop] = model.predict(X_scaled[start:stop])
+    return labels
+
+
+def minibatch_labels(X_scaled, n_clusters, chunk_size=CHUNK_SIZE):
+    """
+    Cluster every row with MiniBatchKMeans and a chunked predict pass.
+    """
+    model = fit_minibatch(X_scaled, n_clusters, chunk_size)
+    return predict_in_chunks(model, X_scaled, chunk_size)
+
+
+def compare_with_full(X_scaled, n_clusters, chunk_size=CHUNK_SIZE):
+    """
+    Report time and accuracy of the MiniBatchKMeans path
+    relative to a full KMeans fit on the same rows.
+    """
+    start = time.perf_counter()
+    full = KMeans(n_clusters=n_clusters, random_state=42).fit(X_scaled)
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = fit_minibatch(X_scaled, n_clusters, chunk_size)
+    labels = predict_in_chunks(model, X_scaled, chunk_size)
+    mini_time = time.perf_counter() - start
+
+    mini_inertia = -model.score(X_scaled)
+    ari = adjusted_rand_score(full.labels_, labels)
+
+    print(f"Full KMeans      : {full_time:.2f}s, inertia {full.inertia_:.1f}")
+    print(f"MiniBatchKMeans  : {mini_time:.2f}s, inertia {mini_inertia:.1f}")
+    print(f"Speed-up: x{full_time / mini_time:.1f}, "
+          f"inertia ratio: {mini_inertia / full.inertia_:.3f}, "
+          f"agreement (ARI): {ari:.3f}")
+    return {"full_time": full_time, "minibatch_time": mini_time,
+            "inertia_ratio": mini_inertia / full.inertia_, "ari": ari}
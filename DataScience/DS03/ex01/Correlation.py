@@ -1,15 +1,13 @@
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder
+from feature_stats import feature_stats, corr_frame
 
-def correlation(df):
+def correlation(data):
     """
-    Encode 'knight' as numbers and print correlation of all numeric columns with it.
+    Print correlation of all numeric columns with 'knight' encoded as numbers.
+    data is a DataFrame or the path of a CSV file; for a path the
+    correlation matrix comes from the cached feature statistics.
     """
-    encoder = LabelEncoder()
-    df['knight_num'] = encoder.fit_transform(df['knight'])
-    df_numeric = df.select_dtypes(include='number')
-    correlations = df_numeric.corr()
-    target_corr = correlations['knight_num'].sort_values(ascending=False)
+    stats = feature_stats(data, target="knight")
+    target_corr = corr_frame(stats)['knight_num'].sort_values(ascending=False)
     print(target_corr)
 
 def main():
@@ -17,8 +15,7 @@ def main():
     Load the dataset and compute correlations.
     """
     csv_path = "../data/Train_knight.csv"
-    df = pd.read_csv(csv_path)
-    correlation(df)
+    correlation(csv_path)
 
 if __name__ == "__main__":
     main()
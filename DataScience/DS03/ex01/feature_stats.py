@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+import hashlib
+import os
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "..", ".feature_stats")
+BLOCK_SIZE = 1 << 20
+
+
+def file_hashes(path, sizes=()):
+    """
+    SHA-1 of the whole file, and of its first 'size' bytes for every
+    size in 'sizes', in a single read. Returns (hash, {size: hash}).
+    """
+    sha = hashlib.sha1()
+    prefixes = {}
+    pending = sorted(set(sizes))
+    read = 0
+    with open(path, "rb") as f:
+        while True:
+            while pending and pending[0] == read:
+                prefixes[pending.pop(0)] = sha.hexdigest()
+            step = min(BLOCK_SIZE, pending[0] - read) if pending else BLOCK_SIZE
+            block = f.read(step)
+            if not block:
+                break
+            sha.update(block)
+            read += len(block)
+    return sha.hexdigest(), prefixes
+
+
+def encode_target(df, target, classes=None):
+    """
+    Numeric frame of the dataset: its numeric columns plus '<target>_num',
+    the target labels encoded in sorted order like LabelEncoder.
+    Returns (frame, classes); classes is None when there is no target.
+    """
+    numeric = df.select_dtypes(include="number").copy()
+    if target not in df.columns:
+        return numeric, None
+    if classes is None:
+        classes = sorted(df[target].unique())
+    codes = pd.Categorical(df[target], categories=classes).codes
+    if (codes < 0).any():
+        raise KeyError(f"New '{target}' labels, the encoding has to be rebuilt.")
+    numeric[f"{target}_num"] = codes
+    return numeric, classes
+
+
+def chunk_stats(values):
+    """
+    Row count, mean and centred cross-product matrix of a chunk.
+    """
+    n = len(values)
+    mean = values.mean(axis=0)
+    centred = values - mean
+    return n, mean, centred.T @ centred
+
+
+def merge_stats(a, b):
+    """
+    Combine the statistics of two chunks (pairwise update of
+    mean and cross-products).
+    """
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + np.outer(delta, delta) * n_a * n_b / n
+    return n, mean, m2
+
+
+def summarise(columns, n, mean, m2):
+    """
+    Means, covariance (ddof=0), per-feature variance and correlation.
+    """
+    columns = [str(c) for c in columns]
+    cov = m2 / n
+    var = np.diag(cov).copy()
+    std = np.sqrt(var)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(std, std)
+    np.fill_diagonal(corr, 1.0)
+    return {"columns": columns, "n": int(n), "mean": mean, "cov": cov,
+            "var": var, "corr": corr}
+
+
+def store_path(content_hash, target):
+    return os.path.join(STORE_DIR, f"{content_hash}_{target}.npz")
+
+
+def save_stats(content_hash, target, size, header, classes, columns, n, mean, m2):
+    os.makedirs(STORE_DIR, exist_ok=True)
+    np.savez(store_path(content_hash, target), size=size, header=np.array(header),
+             classes=np.array(classes if classes is not None else []),
+             has_target=classes is not None, columns=np.array(columns),
+             n=n, mean=mean, m2=m2)
+
+
+def load_entry(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+
+def cached_sizes():
+    """
+    File sizes of every cached dataset.
+    """
+    if not os.path.isdir(STORE_DIR):
+        return set()
+    sizes = set()
+    for name in os.listdir(STORE_DIR):
+        if name.endswith(".npz"):
+            with np.load(os.path.join(STORE_DIR, name), allow_pickle=False) as data:
+                sizes.add(int(data["size"]))
+    return sizes
+
+
+def read_appended(path, entry):
+    """
+    Rows appended to the file after its first entry['size'] bytes,
+    or None if the bytes after the old end do not start new lines.
+    """
+    size = int(entry["size"])
+    with open(path, "rb") as f:
+        f.seek(max(size - 1, 0))
+        last = f.read(1)
+        f.seek(size)
+        first = f.read(1)
+        f.seek(size)
+        if last != b"\n" and first not in (b"\n", b"\r"):
+            return None
+        return pd.read_csv(f, header=None, names=[str(c) for c in entry["header"]])
+
+
+def build_stats(path, target):
+    df = pd.read_csv(path)
+    numeric, classes = encode_target(df, target)
+    n, mean, m2 = chunk_stats(numeric.to_numpy(dtype=float))
+    return list(df.columns), classes, list(numeric.columns), n, mean, m2
+
+
+def extend_stats(path, entry, target):
+    """
+    Add the appended rows to cached statistics.
+    Returns None when they cannot be merged.
+    """
+    appended = read_appended(path, entry)
+    if appended is None:
+        return None
+    classes = [str(c) for c in entry["classes"]] if entry["has_target"] else None
+    try:
+        numeric, classes = encode_target(appended, target, classes)
+    except KeyError:
+        return None
+    if list(numeric.columns) != [str(c) for c in entry["columns"]]:
+        return None
+    stats = (int(entry["n"]), entry["mean"], entry["m2"])
+    if len(numeric):
+        stats = merge_stats(stats, chunk_stats(numeric.to_numpy(dtype=float)))
+    return (list(entry["header"]), classes, list(entry["columns"])) + stats
+
+
+def load_feature_stats(path, target="knight"):
+    """
+    Feature statistics of a CSV dataset, cached on disk by content hash
+    and target: means, covariance, variance and correlation of the numeric columns and
+    of the encoded target ('<target>_num').
+
+    When the file only gained rows since a cached version, only the new
+    rows are read and merged into the cached statistics.
+    Returns a dict with 'columns', 'n', 'mean', 'cov', 'var' and 'corr'.
+    """
+    sizes = cached_sizes()
+    content_hash, prefixes = file_hashes(path, sizes)
+    if os.path.exists(store_path(content_hash, target)):
+        entry = load_entry(store_path(content_hash, target))
+        print(f"Feature statistics of {path} loaded from cache.")
+        return summarise(entry["columns"], int(entry["n"]), entry["mean"], entry["m2"])
+
+    result = None
+    for size, prefix_hash in sorted(prefixes.items(), reverse=True):
+        if os.path.exists(store_path(prefix_hash, target)):
+            result = extend_stats(path, load_entry(store_path(prefix_hash, target)),
+                                  target)
+            if result is not None:
+                print(f"Feature statistics of {path} updated with appended rows.")
+                break
+    if result is None:
+        print(f"Computing feature statistics of {path}...")
+        result = build_stats(path, target)
+
+    header, classes, columns, n, mean, m2 = result
+    save_stats(content_hash, target, os.path.getsize(path), header, classes,
+               columns, n, mean, m2)
+    return summarise(columns, n, mean, m2)
+
+
+def frame_stats(df, target="knight"):
+    """
+    The statistics of load_feature_stats for a frame already in memory,
+    computed without the cache.
+    """
+    numeric, _ = encode_target(df, target)
+    return summarise(numeric.columns, *chunk_stats(numeric.to_numpy(dtype=float)))
+
+
+def feature_stats(data, target="knight"):
+    """
+    Feature statistics of a DataFrame, or of a CSV file given by its path
+    (through the cache).
+    """
+    if isinstance(data, pd.DataFrame):
+        return frame_stats(data, target)
+    return load_feature_stats(data, target)
+
+
+def corr_frame(stats, columns=None):
+    """
+    Correlation matrix as a DataFrame, optionally restricted to 'columns'.
+    """
+    corr = pd.DataFrame(stats["corr"], index=stats["columns"],
+                        columns=stats["columns"])
+    if columns is not None:
+        corr = corr.loc[columns, columns]
+    return corr
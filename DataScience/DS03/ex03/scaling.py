@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+
+class Scaler:
+    """
+    Column scaling shared by the DS03/DS04 scripts and models:
+    x' = (x - offset) / scale, per numeric column.
+
+    - method="standard": offset is the mean, scale the standard deviation
+      (ddof=0, as StandardScaler);
+    - method="minmax": offset is the minimum, scale the range
+      (as MinMaxScaler).
+
+    Fit it once (or build it from cached feature statistics with
+    from_stats) and apply it to any frame with the same columns.
+    transform returns float32 arrays scaled in place, without the
+    intermediate float64 copies of the scikit-learn scalers.
+    Constant columns get a scale of 1.
+    """
+
+    def __init__(self, method="standard", dtype=np.float32):
+        if method not in ("standard", "minmax"):
+            raise ValueError("Invalid method. Choose 'standard' or 'minmax'.")
+        self.method = method
+        self.dtype = dtype
+
+    def fit(self, df):
+        """
+        Learn the offset and scale of the numeric columns of df.
+        """
+        numeric = df.select_dtypes(include="number")
+        values = numeric.to_numpy(dtype=np.float64)
+        if self.method == "standard":
+            offset, scale = values.mean(axis=0), values.std(axis=0)
+        else:
+            offset = values.min(axis=0)
+            scale = values.max(axis=0) - offset
+        return self._set(list(numeric.columns), offset, scale)
+
+    @classmethod
+    def from_stats(cls, stats, columns=None, dtype=np.float32):
+        """
+        Standard scaler from feature_stats.load_feature_stats, without
+        reading the data again. 'columns' defaults to every column except
+        the encoded target ('*_num').
+        """
+        if columns is None:
+            columns = [c for c in stats["columns"] if not c.endswith("_num")]
+        positions = [stats["columns"].index(c) for c in columns]
+        scaler = cls("standard", dtype)
+        return scaler._set(columns, stats["mean"][positions],
+                           np.sqrt(stats["var"][positions]))
+
+    def _set(self, columns, offset, scale):
+        self.columns_ = columns
+        self.offset_ = np.asarray(offset, dtype=np.float64)
+        self.scale_ = np.where(scale == 0, 1.0, scale).astype(np.float64)
+        return self
+
+    def transform(self, X, copy=True):
+        """
+        Scale the fitted columns of a frame (or an array with the same
+        columns in the same order) into a float32 array, in place.
+        With copy=False, an array already of that dtype is itself scaled.
+        """
+        if isinstance(X, pd.DataFrame):
+            X = X[self.columns_]
+        values = np.array(X, dtype=self.dtype, copy=copy or None)
+        values -= self.offset_.astype(self.dtype)
+        values /= self.scale_.astype(self.dtype)
+        return values
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def transform_frame(self, df):
+        """
+        Scaled numeric columns as a DataFrame, for printing and plotting.
+        """
+        return pd.DataFrame(self.transform(df), columns=self.columns_)
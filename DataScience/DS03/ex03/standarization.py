@@ -1,17 +1,22 @@
 import pandas as pd
 import matplotlib.pyplot as plt
-from sklearn.preprocessing import StandardScaler
+import sys
+from scaling import Scaler
 
-def print_and_plot_standarized_values(df):
+sys.path.append("../ex01")
+from feature_stats import load_feature_stats
+
+def print_and_plot_standarized_values(df, scaler=None):
     """
     Standardize numerical columns and print them.
     Plot the first two columns as a scatter plot.
     If 'knight' exists, color points by knight.
+    The scaler is fitted on df unless one is given.
     """
-    df_num = df.select_dtypes(include='number')
-    scaler = StandardScaler()
+    if scaler is None:
+        scaler = Scaler().fit(df)
 
-    df_num_scaled = pd.DataFrame(scaler.fit_transform(df_num), columns=df_num.columns)
+    df_num_scaled = scaler.transform_frame(df)
 
     if 'knight' in df.columns:
         df_num_scaled['knight'] = df['knight'].values
@@ -37,15 +42,16 @@ def print_and_plot_standarized_values(df):
 
 def main():
     """
-    Load datasets and standardize numeric columns.
+    Load datasets and standardize numeric columns, with the means and
+    variances of the cached feature statistics of each file.
     Plot the first two features as a scatter plot.
     """
     csv_path_1 = "../data/Test_knight.csv"
     csv_path_2 = "../data/Train_knight.csv"
-    df_1 = pd.read_csv(csv_path_1)
-    df_2 = pd.read_csv(csv_path_2)
-    print_and_plot_standarized_values(df_1)
-    print_and_plot_standarized_values(df_2)
+    for csv_path in (csv_path_1, csv_path_2):
+        df = pd.read_csv(csv_path)
+        scaler = Scaler.from_stats(load_feature_stats(csv_path))
+        print_and_plot_standarized_values(df, scaler)
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,9 @@
 import pandas as pd
 import matplotlib.pyplot as plt
-from sklearn.preprocessing import MinMaxScaler
+import sys
+
+sys.path.append("../ex03")
+from scaling import Scaler
 
 def print_and_plot_normalized_values(df):
     """
@@ -8,10 +11,7 @@ def print_and_plot_normalized_values(df):
     Plot the first two columns as a scatter plot.
     If 'knight' exists, color points by knight.
     """
-    df_num = df.select_dtypes(include='number')
-    scaler = MinMaxScaler()
-
-    df_num_norm = pd.DataFrame(scaler.fit_transform(df_num), columns=df_num.columns)
+    df_num_norm = Scaler("minmax").fit(df).transform_frame(df)
 
     if 'knight' in df.columns:
         df_num_norm['knight'] = df['knight'].values
@@ -0,0 +1,52 @@
+import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.model_selection import KFold, StratifiedKFold
+
+DATA = None
+
+
+def fold_indices(df, n_splits=5, target="knight", stratified=True, seed=42):
+    """
+    (train_idx, val_idx) position arrays of every fold, shuffled once.
+    Stratified folds keep the share of each 'target' label in every fold.
+    """
+    if stratified:
+        splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+        return list(splitter.split(np.zeros(len(df)), df[target]))
+    splitter = KFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    return list(splitter.split(np.zeros(len(df))))
+
+
+def init_worker(df):
+    """
+    Keep the dataset in the worker, so each fold only sends its indices.
+    """
+    global DATA
+    DATA = df
+
+
+def run_fold(evaluate, train_idx, val_idx):
+    return evaluate(DATA.iloc[train_idx], DATA.iloc[val_idx])
+
+
+def cross_validate(df, evaluate, n_splits=5, target="knight", stratified=True,
+                   n_jobs=None, seed=42):
+    """
+    Run evaluate(df_train, df_val) on every fold of df and return the
+    results in fold order.
+
+    Folds are index arrays into the in-memory frame: nothing is written
+    to disk. They run in a process pool that receives the dataset once
+    per worker; n_jobs=1 runs them in this process instead (e.g. when
+    already inside a worker). 'evaluate' must be a module-level function,
+    or a functools.partial of one, so it can be sent to the workers.
+    """
+    folds = fold_indices(df, n_splits, target, stratified, seed)
+    train_idx, val_idx = zip(*folds)
+    if n_jobs == 1:
+        return [evaluate(df.iloc[t], df.iloc[v]) for t, v in folds]
+    workers = n_jobs or min(n_splits, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(df,)) as pool:
+        return list(pool.map(run_fold, [evaluate] * len(folds), train_idx, val_idx))
@@ -1,18 +1,98 @@
 import pandas as pd
+import numpy as np
+import sys
 
+HASH_BUCKETS = 10_000
 
-def split(df, train_frac):
-    df_shuffled = df.sample(frac=1, random_state=42)
-    train_size = int(len(df_shuffled) * train_frac) 
-    df_train = df_shuffled.iloc[:train_size]
-    df_val = df_shuffled.iloc[train_size:]
+
+def split_indices(df, train_frac, stratify=None, seed=42):
+    """
+    Shuffle the row positions of df and cut them into train and
+    validation position arrays, without copying the data.
+    With 'stratify' (a column such as 'knight'), every label is cut
+    separately so both parts keep its share.
+    Without it, the order is the one df.sample(frac=1, random_state=seed)
+    gives.
+    """
+    rng = np.random.RandomState(seed)
+    if stratify is None:
+        order = rng.permutation(len(df))
+        train_size = int(len(df) * train_frac)
+        return order[:train_size], order[train_size:]
+
+    labels = df[stratify].to_numpy()
+    train, val = [], []
+    for label in pd.unique(labels):
+        positions = rng.permutation(np.flatnonzero(labels == label))
+        train_size = int(round(len(positions) * train_frac))
+        train.append(positions[:train_size])
+        val.append(positions[train_size:])
+    return rng.permutation(np.concatenate(train)), rng.permutation(np.concatenate(val))
+
+
+def split_frames(df, train_frac, stratify=None, seed=42):
+    """
+    Train and validation frames selected with iloc from split_indices.
+    Pandas copies rows selected by position arrays; keep the index
+    arrays instead when memory matters.
+    """
+    train_idx, val_idx = split_indices(df, train_frac, stratify, seed)
+    return df.iloc[train_idx], df.iloc[val_idx]
+
+
+def split(df, train_frac, stratify=None, seed=42):
+    """
+    Split df and write Training_knight.csv and Validation_knight.csv.
+    """
+    df_train, df_val = split_frames(df, train_frac, stratify, seed)
     df_train.to_csv("Training_knight.csv", index=False)
     df_val.to_csv("Validation_knight.csv", index=False)
+    return df_train, df_val
+
+
+def hash_assign(chunk, train_frac, seed=42):
+    """
+    True for the rows going to the training part, decided by a hash of
+    the row content: the same row always lands in the same part, whatever
+    the chunk or file order.
+    """
+    hash_key = f"{seed:016d}"[-16:]
+    hashes = pd.util.hash_pandas_object(chunk, index=False, hash_key=hash_key)
+    return (hashes.to_numpy() % HASH_BUCKETS) < train_frac * HASH_BUCKETS
+
+
+def stream_split(path, train_frac, train_path="Training_knight.csv",
+                 val_path="Validation_knight.csv", chunk_size=100_000, seed=42):
+    """
+    Split a CSV file too large to shuffle in memory, in one pass:
+    rows are read chunk by chunk and assigned by hash_assign.
+    Each label keeps about its share in both parts, without an explicit
+    stratification. Returns the number of rows written to each part.
+    """
+    counts = [0, 0]
+    for i, chunk in enumerate(pd.read_csv(path, chunksize=chunk_size)):
+        to_train = hash_assign(chunk, train_frac, seed)
+        mode = "w" if i == 0 else "a"
+        chunk[to_train].to_csv(train_path, mode=mode, header=i == 0, index=False)
+        chunk[~to_train].to_csv(val_path, mode=mode, header=i == 0, index=False)
+        counts[0] += int(to_train.sum())
+        counts[1] += int((~to_train).sum())
+    print(f"{counts[0]} training rows written to {train_path}, "
+          f"{counts[1]} validation rows to {val_path}.")
+    return tuple(counts)
 
 def main():
+    """
+    Usage: python split.py [--stratify] [--stream]
+        --stratify  keep the share of each knight label in both parts
+        --stream    split the file chunk by chunk, rows assigned by hash
+    """
     csv_path = "../data/Train_knight.csv"
+    if "--stream" in sys.argv:
+        stream_split(csv_path, 0.8)
+        return
     df = pd.read_csv(csv_path)
-    split(df, 0.8)
+    split(df, 0.8, stratify="knight" if "--stratify" in sys.argv else None)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
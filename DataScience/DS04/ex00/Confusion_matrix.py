@@ -1,50 +1,95 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
+import time
+import sys
 
-def conf_matrix(df_1, df_2):
+CHUNK_SIZE = 1_000_000
+
+def encode_labels(values, classes):
     """
-    Build confusion matrix manually and compute precision, recall, f1-score, and accuracy.
+    Integer codes of the labels in 'classes' (a list of labels).
+    Labels seen for the first time are appended to 'classes'.
     """
-    if df_1.shape != df_2.shape:
-        print("Shape of data is not equal")
-        return
+    codes, uniques = pd.factorize(np.asarray(values))
+    index = {label: k for k, label in enumerate(classes)}
+    for label in uniques:
+        if label not in index:
+            index[label] = len(classes)
+            classes.append(label)
+    lookup = np.array([index[label] for label in uniques], dtype=np.int64)
+    return lookup[codes]
+
 
-    classes = pd.Index(df_1['knight'].unique()).union(df_2['knight'].unique())
+def partial_matrix(true, pred, classes):
+    """
+    Confusion matrix of one chunk of labels, rows are true labels and
+    columns predictions, in the order of 'classes' (extended if needed).
+    """
+    t = encode_labels(true, classes)
+    p = encode_labels(pred, classes)
     n = len(classes)
+    return np.bincount(t * n + p, minlength=n * n).reshape(n, n)
+
 
-    matrix = np.zeros((n, n), dtype=int)
+def accumulate(total, partial):
+    """
+    Add a partial confusion matrix to a running total.
+    The partial one may have more classes, appended at the end.
+    """
+    if total is None:
+        return partial.copy()
+    grow = partial.shape[0] - total.shape[0]
+    if grow > 0:
+        total = np.pad(total, ((0, grow), (0, grow)))
+    total[:partial.shape[0], :partial.shape[1]] += partial
+    return total
 
-    for true, pred in zip(df_1['knight'], df_2['knight']):
-        i = np.where(classes == true)[0][0]
-        j = np.where(classes == pred)[0][0]
-        matrix[i, j] += 1
 
-    metrics = []
-    for k, cls in enumerate(classes):
-        TP = matrix[k, k]
-        FP = matrix[:, k].sum() - TP
-        FN = matrix[k, :].sum() - TP
+def sort_classes(matrix, classes):
+    """
+    Reorder the matrix so the classes are sorted.
+    """
+    order = np.argsort(np.asarray(classes, dtype=object))
+    return matrix[np.ix_(order, order)], pd.Index(classes)[order]
 
-        precision = TP / (TP + FP) if (TP + FP) != 0 else 0
-        recall = TP / (TP + FN) if (TP + FN) != 0 else 0
-        f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) != 0 else 0
-        total = matrix[k, :].sum()
 
-        metrics.append([round(precision, 2), round(recall, 2), round(f1, 2), total])
+def class_metrics(matrix):
+    """
+    Precision, recall, f1-score and support of every class, 0 where undefined.
+    """
+    tp = np.diag(matrix).astype(float)
+    predicted = matrix.sum(axis=0)
+    support = matrix.sum(axis=1)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted != 0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support != 0)
+    both = precision + recall
+    f1 = np.divide(2 * precision * recall, both, out=np.zeros_like(tp), where=both != 0)
+    return precision, recall, f1, support
 
-    df_metrics = pd.DataFrame(metrics,
-                              index=classes,
-                              columns=["precision", "recall", "f1-score", "total"])
 
+def metrics_table(matrix, classes):
+    """
+    Per-class metrics and accuracy, laid out like a classification report.
+    """
+    precision, recall, f1, support = class_metrics(matrix)
+    df_metrics = pd.DataFrame({"precision": precision.round(2),
+                               "recall": recall.round(2),
+                               "f1-score": f1.round(2),
+                               "total": support}, index=classes, dtype=object)
     accuracy = round(np.trace(matrix) / matrix.sum(), 2)
-    total = matrix.sum()
-    df_metrics.loc["accuracy"] = ["", "", accuracy, total]
+    df_metrics.loc["accuracy"] = ["", "", accuracy, matrix.sum()]
+    return df_metrics
 
-    print(df_metrics)
-    print(matrix)
 
-    plt.figure(figsize=(6, 5))
+def plot_matrix(matrix, classes, show=True):
+    """
+    Display the confusion matrix with the count in every cell.
+    """
+    n = len(classes)
+    fig = plt.figure(figsize=(6, 5))
     plt.imshow(matrix, cmap="coolwarm")
     plt.xticks(range(n), classes)
     plt.yticks(range(n), classes)
@@ -53,13 +98,107 @@ def conf_matrix(df_1, df_2):
     for i in range(n):
         for j in range(n):
             plt.text(j, i, matrix[i, j], ha='center', va='center', color='black')
-    plt.show()
+    if show:
+        plt.show()
+    return fig
+
+
+def conf_matrix(df_1, df_2):
+    """
+    Build confusion matrix and compute precision, recall, f1-score, and accuracy.
+    """
+    if df_1.shape != df_2.shape:
+        print("Shape of data is not equal")
+        return
+
+    classes = []
+    matrix = partial_matrix(df_1['knight'], df_2['knight'], classes)
+    matrix, classes = sort_classes(matrix, classes)
+
+    print(metrics_table(matrix, classes))
+    print(matrix)
+    plot_matrix(matrix, classes)
+    return matrix
+
+
+def read_labels(path, chunk_size=CHUNK_SIZE):
+    """
+    Iterate over a label file, one label per line, chunk_size lines at a time.
+    """
+    return pd.read_csv(path, header=None, names=['knight'], dtype=str,
+                       chunksize=chunk_size)
+
+
+def stream_matrix(truth_path, prediction_path, chunk_size=CHUNK_SIZE):
+    """
+    Build the confusion matrix of a prediction file by reading it in
+    lockstep with the truth file, one chunk of each at a time, so memory
+    does not grow with the file size.
+    Returns (matrix, classes, rows, seconds).
+    """
+    start = time.perf_counter()
+    classes = []
+    total = None
+    rows = 0
+    for truth, pred in zip_longest(read_labels(truth_path, chunk_size),
+                                   read_labels(prediction_path, chunk_size)):
+        if truth is None or pred is None or len(truth) != len(pred):
+            raise ValueError(f"'{truth_path}' and '{prediction_path}' "
+                             "do not have the same number of labels.")
+        total = accumulate(total, partial_matrix(truth['knight'], pred['knight'],
+                                                 classes))
+        rows += len(truth)
+    if total is None:
+        raise ValueError(f"'{truth_path}' is empty.")
+    matrix, classes = sort_classes(total, classes)
+    return matrix, classes, rows, time.perf_counter() - start
+
+
+def evaluate_files(truth_path, prediction_paths, chunk_size=CHUNK_SIZE, n_jobs=None):
+    """
+    Evaluate several prediction files against one truth file, one process
+    per file, and print the metrics and throughput of each.
+    Returns {prediction_path: matrix}.
+    """
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        results = list(pool.map(stream_matrix,
+                                [truth_path] * len(prediction_paths),
+                                prediction_paths,
+                                [chunk_size] * len(prediction_paths)))
+
+    matrices = {}
+    for path, (matrix, classes, rows, seconds) in zip(prediction_paths, results):
+        print(f"\n{path}: {rows} labels in {seconds:.2f}s "
+              f"({rows / max(seconds, 1e-9):,.0f} labels/s)")
+        print(metrics_table(matrix, classes))
+        print(matrix)
+        matrices[path] = matrix
+    return matrices
 
 
 def main():
     """
     Load truth and prediction files, then display confusion matrix and metrics.
+
+    Usage:
+        python Confusion_matrix.py
+        python Confusion_matrix.py --stream <truth> <predictions>... [--chunk N]
+    The streaming mode reads the files chunk by chunk and evaluates every
+    prediction file in parallel, without plotting.
     """
+    if "--stream" in sys.argv:
+        args = [a for a in sys.argv[1:] if a != "--stream"]
+        chunk_size = CHUNK_SIZE
+        if "--chunk" in args:
+            i = args.index("--chunk")
+            chunk_size = int(args[i + 1])
+            del args[i:i + 2]
+        if len(args) < 2:
+            raise ValueError("Usage: python Confusion_matrix.py --stream "
+                             "<truth> <predictions>... [--chunk N]")
+        evaluate_files(args[0], args[1:], chunk_size)
+        return
+
     truth_path = "../data/truth.txt"
     prediction_path = "../data/predictions.txt"
     df_truth = pd.read_csv(truth_path, header=None, names=['knight'])
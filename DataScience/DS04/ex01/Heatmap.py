@@ -1,14 +1,19 @@
 import matplotlib.pyplot as plt
-import pandas as pd
 import seaborn as sns
+import sys
 
-def plot_heat_map(df):
+sys.path.append("../../DS03/ex01")
+from feature_stats import feature_stats, corr_frame
+
+def plot_heat_map(data):
     """
     Plot a heatmap of the correlation coefficient between numerical columns.
+    data is a DataFrame or the path of a CSV file; for a path the
+    correlation matrix is read from the cached feature statistics.
     """
-    df_numeric = df.select_dtypes(include='number')
-    
-    corr_matrix = df_numeric.corr()
+    stats = feature_stats(data)
+    columns = [col for col in stats["columns"] if col != "knight_num"]
+    corr_matrix = corr_frame(stats, columns)
     
     plt.figure(figsize=(10, 8))
     sns.heatmap(corr_matrix, annot=False, fmt=".2f", cmap="coolwarm", cbar=True)
@@ -24,9 +29,7 @@ def main():
     """
     path = "../data/Train_knight.csv"
     
-    df = pd.read_csv(path)
-    
-    plot_heat_map(df)
+    plot_heat_map(path)
 
 
 if __name__ == "__main__":
@@ -1,66 +1,140 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
+import sys
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.utils.extmath import randomized_svd
 
-def mean(data):
+sys.path.append("../../DS03/ex01")
+from feature_stats import load_feature_stats
+sys.path.append("../../DS03/ex03")
+from scaling import Scaler
+
+CHUNK_SIZE = 10_000
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE, min_rows=1):
+    """
+    Numeric columns of a CSV file as float arrays, chunk_size rows at a time.
+    A last chunk shorter than min_rows is merged into the one before it.
+    """
+    previous = None
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        values = chunk.select_dtypes(include='number').to_numpy(dtype=float)
+        if previous is not None:
+            if len(values) < min_rows:
+                values = np.vstack([previous, values])
+            else:
+                yield previous
+        previous = values
+    if previous is not None:
+        yield previous
+
+
+def full_variance_curve(df):
+    """
+    Cumulative explained variance (%) of every component of the scaled
+    numeric features, with a full PCA.
+    """
+    scaled_data = Scaler().fit_transform(df)
+
+    pca = PCA()
+    pca.fit(scaled_data)
+
+    return pca.explained_variance_ratio_.cumsum() * 100
+
+
+def randomized_variance_curve(df, threshold=90, n_components=8, seed=42):
     """
-    Calculate the mean (average) of a list of numbers.
+    Cumulative explained variance (%) of the leading components only,
+    with randomized SVD. The number of components is doubled until the
+    curve crosses the threshold, then the search stops.
     """
-    return sum(data) / len(data)
+    scaled_data = Scaler().fit_transform(df)
+    total = np.square(scaled_data).sum()
+    max_components = min(scaled_data.shape)
+    n_components = min(n_components, max_components)
+    while True:
+        _, s, _ = randomized_svd(scaled_data, n_components, random_state=seed)
+        cum_var = np.cumsum(s ** 2) / total * 100
+        if cum_var[-1] >= threshold or n_components == max_components:
+            return cum_var
+        n_components = min(2 * n_components, max_components)
 
 
-def variance(data_sorted):
+def incremental_variance_curve(path, threshold=90, n_components=8,
+                               chunk_size=CHUNK_SIZE):
     """
-    Calculate the variance of a list of numbers.
+    Cumulative explained variance (%) of the leading components, reading
+    the CSV file from disk chunk by chunk instead of loading it.
+    The scaler comes from the cached feature statistics of the file, and
+    each pass fits an IncrementalPCA. As in randomized_variance_curve, the
+    number of components is doubled, with a new pass each time, until the
+    curve crosses the threshold.
     """
-    n = len(data_sorted)
-    m = mean(data_sorted)
-    return sum((x - m)**2 for x in data_sorted) / n
+    scaler = Scaler.from_stats(load_feature_stats(path))
+    n_features = len(scaler.columns_)
 
+    n_components = min(n_components, n_features)
+    while True:
+        pca = IncrementalPCA(n_components=n_components)
+        for values in read_chunks(path, max(chunk_size, n_components),
+                                  min_rows=n_components):
+            pca.partial_fit(scaler.transform(values, copy=False))
+        cum_var = pca.explained_variance_ratio_.cumsum() * 100
+        if cum_var[-1] >= threshold or n_components == n_features:
+            return cum_var
+        n_components = min(2 * n_components, n_features)
 
-def plot_variance(df):
+
+def plot_variance(cum_var, threshold=90, show=True):
     """
-    Perform PCA on numeric features of the dataframe, 
-    compute cumulative explained variance, and plot it.
+    Plot a cumulative explained variance curve.
     
     Behavior:
-        - Scales numeric features to zero mean and unit variance.
-        - Computes principal components using PCA.
         - Plots cumulative variance explained by components.
-        - Draws a horizontal line at 90% threshold to visualize 
-          how many components are needed to reach 90% explained variance.
+        - Draws a horizontal line at the threshold (90% by default) to
+          visualize how many components are needed to reach it.
+        - Prints that number of components.
     """
-    numeric_df = df.select_dtypes(include='number')
-    
-    scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(numeric_df)
-    
-    pca = PCA()
-    pca.fit(scaled_data)
-
-    cum_var = pca.explained_variance_ratio_.cumsum() * 100
+    needed = int(np.searchsorted(cum_var, threshold)) + 1
+    if needed <= len(cum_var):
+        print(f"{needed} components explain {threshold}% of the variance.")
 
-    plt.figure(figsize=(8,5))
+    fig = plt.figure(figsize=(8,5))
     plt.plot(range(1, len(cum_var)+1), cum_var)
-    plt.axhline(90, color='r', linestyle='--', label='90% threshold')
+    plt.axhline(threshold, color='r', linestyle='--', label=f'{threshold}% threshold')
     plt.xlabel("Number of components")
     plt.ylabel("Cumulative variance (%)")
     plt.title("PCA Cumulative Variance Curve")
     plt.grid(True)
     plt.legend()
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 
 def main():
     """
     Load the dataset and plot the cumulative variance curve using PCA.
+
+    Usage: python variances.py [--randomized | --incremental [chunk_size]]
+        --randomized   only the components up to the 90% threshold
+        --incremental  IncrementalPCA over chunks read from disk,
+                       also stopping at the 90% threshold
     """
     path = "../data/Train_knight.csv"
-    
-    df = pd.read_csv(path)
 
-    plot_variance(df)
+    if "--incremental" in sys.argv:
+        i = sys.argv.index("--incremental")
+        chunk_size = int(sys.argv[i + 1]) if len(sys.argv) > i + 1 else CHUNK_SIZE
+        cum_var = incremental_variance_curve(path, chunk_size=chunk_size)
+    elif "--randomized" in sys.argv:
+        cum_var = randomized_variance_curve(pd.read_csv(path))
+    else:
+        cum_var = full_variance_curve(pd.read_csv(path))
+
+    plot_variance(cum_var)
 
 
 if __name__ == "__main__":
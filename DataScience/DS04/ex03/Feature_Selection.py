@@ -1,43 +1,80 @@
+import numpy as np
 import pandas as pd
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-from statsmodels.tools.tools import add_constant
+from scipy.linalg.blas import dsyr
+import sys
 
+sys.path.append("../../DS03/ex01")
+from feature_stats import load_feature_stats, corr_frame
 
-def calculate_vif(df):
-    X = add_constant(df)
+
+def calculate_vif(corr):
+    """
+    VIF of every feature from its correlation matrix: the diagonal of the
+    inverse correlation matrix, i.e. 1 / (1 - R²) of each feature
+    regressed on the others with an intercept.
+    """
     vif_data = pd.DataFrame()
-    vif_data["feature"] = X.columns
-    vif_data["VIF"] = [variance_inflation_factor(X.values, i) for i in range(X.shape[1])]
+    vif_data["feature"] = corr.columns
+    vif_data["VIF"] = np.diag(np.linalg.inv(corr.values))
     return vif_data
 
-def optimise_features(df):
-
-    while(True):
-        df_vif = calculate_vif(df)
-        df_vif["Tolerance"] = 1 / df_vif["VIF"]
-        df_vif_nc = df_vif[df_vif["feature"] != "const"]
-        max_vif = df_vif_nc["VIF"].max()
-        if max_vif > 5:
-            max_feature = df_vif_nc.loc[df_vif_nc["VIF"].idxmax(), "feature"]
-            if max_feature in df.columns:
-                df = df.drop(columns = max_feature)
-        else:
+def downdate_inverse(inv, j, active):
+    """
+    Remove feature j from the inverse correlation matrix, in place.
+    The inverse of the remaining features is the Schur complement
+    P - P[:, j] P[j, :] / P[j, j], a symmetric rank-one update in O(p²)
+    instead of a new O(p³) inversion. Rows of features no longer 'active'
+    are left untouched, and only the upper triangle is kept up to date.
+    """
+    col = np.concatenate([inv[:j + 1, j], inv[j, j + 1:]])
+    col[~active] = 0
+    inv = dsyr(-1 / col[j], col, a=inv, overwrite_a=True)
+    active[j] = False
+    return inv
+
+
+def eliminate_collinear(corr, threshold=5):
+    """
+    Drop the feature with the highest VIF until every VIF is at most
+    'threshold'. The correlation matrix is inverted once; each drop
+    updates the inverse instead of recomputing every regression.
+    Returns the kept features and their VIF.
+    """
+    inv = np.asfortranarray(np.linalg.inv(corr.values))
+    active = np.ones(len(inv), dtype=bool)
+    while True:
+        vif = np.where(active, np.diag(inv), -np.inf)
+        worst = int(vif.argmax())
+        if vif[worst] <= threshold:
             break
-   
-    print(df_vif_nc) 
+        inv = downdate_inverse(inv, worst, active)
+    return list(corr.columns[active]), vif[active]
+
+
+def optimise_features(corr, threshold=5):
+    """
+    Print the VIF and tolerance of the features left once the collinear
+    ones have been removed.
+    """
+    features, vif = eliminate_collinear(corr, threshold)
+    df_vif = pd.DataFrame({"feature": features, "VIF": vif})
+    df_vif["Tolerance"] = 1 / df_vif["VIF"]
+    print(df_vif)
+    return df_vif
 
 
 def main():
     """
-    Load the dataset and 
+    Load the cached correlation matrix of the dataset and drop the most
+    collinear feature until every VIF is 5 or less.
     """
     path = "../data/Train_knight.csv"
     
-    df = pd.read_csv(path)
-    X = df.select_dtypes(include=["number"]).copy()
-    optimise_features(X)
+    stats = load_feature_stats(path)
+    features = [col for col in stats["columns"] if col != "knight_num"]
+    optimise_features(corr_frame(stats, features))
     
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
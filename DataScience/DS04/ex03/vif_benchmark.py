@@ -0,0 +1,96 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from statsmodels.stats.outliers_influence import variance_inflation_factor
+from statsmodels.tools.tools import add_constant
+
+from Feature_Selection import calculate_vif, eliminate_collinear
+
+
+def collinear_data(n_rows, n_features, seed=42):
+    """
+    Features built from a third as many latent factors plus noise,
+    so many of them are strongly collinear.
+    """
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(n_rows, max(1, n_features // 3)))
+    weights = rng.normal(size=(factors.shape[1], n_features))
+    X = factors @ weights + rng.normal(scale=0.5, size=(n_rows, n_features))
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(n_features)])
+
+
+def statsmodels_vif(df):
+    """
+    One VIF per feature, one OLS regression each (the previous path).
+    """
+    X = add_constant(df).values
+    return np.array([variance_inflation_factor(X, i) for i in range(1, X.shape[1])])
+
+
+def eliminate_reinvert(corr, threshold):
+    """
+    Elimination inverting the reduced correlation matrix after every drop.
+    """
+    while True:
+        vif = calculate_vif(corr)
+        worst = vif["VIF"].idxmax()
+        if vif["VIF"][worst] <= threshold:
+            return list(corr.columns)
+        feature = vif["feature"][worst]
+        corr = corr.drop(index=feature, columns=feature)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(n_features, args):
+    df = collinear_data(max(args.rows, 2 * n_features), n_features)
+    corr, t_corr = timed(lambda: pd.DataFrame(np.corrcoef(df.values, rowvar=False),
+                                              index=df.columns, columns=df.columns))
+    result = {"features": n_features, "corr": t_corr}
+
+    vif, result["one pass closed form"] = timed(calculate_vif, corr)
+    if n_features <= args.statsmodels_max:
+        reference, result["one pass statsmodels"] = timed(statsmodels_vif, df)
+        result["max rel. diff"] = np.max(np.abs(vif["VIF"].values - reference) / reference)
+
+    (kept_fast, _), result["elimination downdate"] = timed(eliminate_collinear, corr,
+                                                          args.threshold)
+    if n_features <= args.reinvert_max:
+        kept, result["elimination re-invert"] = timed(eliminate_reinvert, corr,
+                                                      args.threshold)
+        result["same features kept"] = kept == kept_fast
+    result["kept"] = len(kept_fast)
+    return result
+
+
+def main():
+    """
+    Compare the VIF computations on synthetic collinear data:
+    one statsmodels regression per feature against the diagonal of the
+    inverse correlation matrix, and the elimination loop re-inverting
+    after each drop against the Schur-complement downdate.
+        python vif_benchmark.py 30 300 3000
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("sizes", nargs="*", type=int, default=[30, 300, 3000])
+    parser.add_argument("--rows", type=int, default=2000,
+                        help="rows of synthetic data (at least twice the features)")
+    parser.add_argument("--threshold", type=float, default=5)
+    parser.add_argument("--statsmodels-max", type=int, default=300,
+                        help="skip statsmodels above this number of features")
+    parser.add_argument("--reinvert-max", type=int, default=300,
+                        help="skip the re-inverting elimination above this number of features")
+    args = parser.parse_args()
+
+    results = [run(n, args) for n in args.sizes]
+    table = pd.DataFrame(results).set_index("features").T
+    print(table.to_string(float_format=lambda x: f"{x:.4g}"))
+
+
+if __name__ == "__main__":
+    main()
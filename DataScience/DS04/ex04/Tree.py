@@ -1,12 +1,14 @@
 import pandas as pd
+import numpy as np
 import sys
+from functools import partial
 from sklearn.tree import DecisionTreeClassifier, plot_tree
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import f1_score
 import matplotlib.pyplot as plt
 
 sys.path.append("../../DS03/ex05")
-from split import split
+from cross_validation import cross_validate
 
 
 def visualize_tree(clf, X_train):
@@ -25,7 +27,7 @@ def visualize_tree(clf, X_train):
     plt.show()
 
 
-def train_model(df_train, model_type="decision_tree"):
+def train_model(df_train, model_type="decision_tree", visualize=True):
     """
     Train a classifier and return the trained model.
     """
@@ -35,7 +37,8 @@ def train_model(df_train, model_type="decision_tree"):
     if model_type == "decision_tree":
         clf = DecisionTreeClassifier(random_state=42)
         clf.fit(X_train, y_train)
-        visualize_tree(clf, X_train)
+        if visualize:
+            visualize_tree(clf, X_train)
     elif model_type == "random_forest":
         clf = RandomForestClassifier(n_estimators=100, random_state=42)
         clf.fit(X_train, y_train)
@@ -56,22 +59,30 @@ def predict_model(clf, df_test):
     return predictions
 
 
-def evaluate_model(df, model_type="random_forest", average_type="weighted"):
+def fold_f1(df_train, df_val, model_type, average_type):
     """
-    Split df into training and validation, train a model, and calculate F1-score.
+    Train on one cross-validation fold and return its F1-score.
     """
-    split(df, 0.8)
-    df_train = pd.read_csv("Training_knight.csv")
-    df_val = pd.read_csv("Validation_knight.csv")
-
-    clf = train_model(df_train, model_type=model_type)
+    clf = train_model(df_train, model_type=model_type, visualize=False)
 
     X_val = df_val.drop(columns="knight")
     y_val = df_val["knight"]
     y_pred = clf.predict(X_val)
 
-    score = f1_score(y_val, y_pred, average=average_type)
-    print(f"Model: {model_type}, Average: {average_type}, Weighted F1 Score: {score:.4f}")
+    return f1_score(y_val, y_pred, average=average_type)
+
+
+def evaluate_model(df, model_type="random_forest", average_type="weighted", n_splits=5):
+    """
+    Cross-validate a model on df (stratified folds, run in parallel)
+    and print its mean F1-score.
+    """
+    scores = cross_validate(df, partial(fold_f1, model_type=model_type,
+                                        average_type=average_type), n_splits)
+    score = np.mean(scores)
+    print(f"Model: {model_type}, Average: {average_type}, F1 Score: {score:.4f} "
+          f"(± {np.std(scores):.4f} over {n_splits} folds)")
+    return score
 
 
 def main():
@@ -1,12 +1,16 @@
 import pandas as pd
+import numpy as np
 import sys
-from sklearn.preprocessing import StandardScaler
+from functools import partial
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.metrics import f1_score, accuracy_score
 import matplotlib.pyplot as plt
 
 sys.path.append("../../DS03/ex05")
-from split import split
+sys.path.append("../../DS03/ex03")
+from cross_validation import cross_validate, fold_indices
+from knn_sweep import fold_scores, compare_with_loop
+from lsh import LSHNeighborsClassifier
+from scaling import Scaler
 
 
 def visualize_KNN(k_values, acc_list):
@@ -22,16 +26,23 @@ def visualize_KNN(k_values, acc_list):
     plt.show()
 
 
-def train_model(df_train, k):
+def train_model(df_train, k, backend="exact", **ann_params):
     """
     Train a K-Nearest Neighbors classifier on the provided training data.
+    backend="lsh" uses the approximate LSHNeighborsClassifier instead of
+    exact search; ann_params (n_tables, n_bits) set its recall/latency
+    trade-off.
     """
-    X_train = df_train.drop(columns="knight")
     y_train = df_train["knight"]
 
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    knn = KNeighborsClassifier(n_neighbors=k)
+    scaler = Scaler().fit(df_train)
+    X_train_scaled = scaler.transform(df_train)
+    if backend == "lsh":
+        knn = LSHNeighborsClassifier(n_neighbors=k, **ann_params)
+    elif backend == "exact":
+        knn = KNeighborsClassifier(n_neighbors=k)
+    else:
+        raise ValueError("Invalid backend. Choose 'exact' or 'lsh'.")
     knn.fit(X_train_scaled, y_train)
 
     return knn, scaler
@@ -47,38 +58,25 @@ def predict_model(knn, df_test):
             f.write(p + "\n")
 
 
-def evaluate_model(df):
+def evaluate_model(df, compare=False, n_splits=5):
     """
-    Split the dataset into training and validation sets, evaluate KNN models for k=1..30,
-    calculate accuracy and F1-score, and visualize the results.
+    Cross-validate KNN models for k=1..29 on stratified folds run in parallel,
+    average accuracy and F1-score over the folds, and visualize the results.
+    In every fold all k are scored from a single neighbour query; with
+    'compare', the sweep is also timed against fitting one model per k.
     """
-    split(df, 0.8)
-    df_train = pd.read_csv("Training_knight.csv")
-    df_val = pd.read_csv("Validation_knight.csv")
-
-    scaler = StandardScaler()
-
-    X_train = df_train.drop(columns="knight")
-    y_train = df_train["knight"]
-
-    X_val = df_val.drop(columns="knight")
-    y_val = df_val["knight"]
-
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_val_scaled = scaler.transform(X_val)
-
-    f1_scores = []
-    acc_list = []
     k_values = range(1, 30)
-
-    for k in k_values:
-        knn = KNeighborsClassifier(n_neighbors=k)
-        knn.fit(X_train_scaled, y_train)
-        y_pred = knn.predict(X_val_scaled)
-        f1 = f1_score(y_val, y_pred, average="weighted")
-        acc = accuracy_score(y_val, y_pred)
-        acc_list.append(acc)
-        f1_scores.append(f1)
+    if compare:
+        train_idx, val_idx = fold_indices(df, n_splits)[0]
+        scaler = Scaler().fit(df.iloc[train_idx])
+        X_train = scaler.transform(df.iloc[train_idx])
+        X_val = scaler.transform(df.iloc[val_idx])
+        compare_with_loop(X_train, df["knight"].iloc[train_idx], X_val,
+                          df["knight"].iloc[val_idx], k_values)
+
+    scores = cross_validate(df, partial(fold_scores, k_values=k_values), n_splits)
+    acc_list = list(np.mean([acc for acc, _ in scores], axis=0))
+    f1_scores = list(np.mean([f1 for _, f1 in scores], axis=0))
 
     visualize_KNN(k_values, acc_list)
 
@@ -97,17 +95,22 @@ def main():
     - Train final KNN on all training data
     - Scale test data and predict
     - Save predictions to 'KNN.txt'
+    With --compare, the k sweep is timed against the per-k loop.
+    With --lsh, the final model uses the approximate LSH backend.
     """
-    if len(sys.argv) != 3:
-        raise ValueError("Usage: python KNN.py <Train_knight.csv> <Test_knight.csv>")
+    args = [arg for arg in sys.argv[1:] if arg not in ("--compare", "--lsh")]
+    if len(args) != 2:
+        raise ValueError("Usage: python KNN.py <Train_knight.csv> <Test_knight.csv> "
+                         "[--compare] [--lsh]")
 
-    path_train, path_test = sys.argv[1], sys.argv[2]
+    path_train, path_test = args[0], args[1]
     df_train = pd.read_csv(path_train)
     df_test = pd.read_csv(path_test)
 
-    k= evaluate_model(df_train)
+    k= evaluate_model(df_train, compare="--compare" in sys.argv)
 
-    knn, scaler = train_model(df_train, k)
+    knn, scaler = train_model(df_train, k,
+                              backend="lsh" if "--lsh" in sys.argv else "exact")
 
     X_test_scaled = scaler.transform(df_test)
     predict_model(knn, X_test_scaled)
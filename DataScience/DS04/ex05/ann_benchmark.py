@@ -0,0 +1,83 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KNeighborsClassifier
+
+from lsh import LSHNeighborsClassifier
+
+
+def knight_like_data(n_rows, n_features=30, n_factors=6, n_clusters=20, seed=42):
+    """
+    Standardized data with two labels, shaped like the knights: clustered
+    points in a few latent factors, mixed into many collinear features.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=2.0, size=(n_clusters, n_factors))
+    cluster = rng.integers(0, n_clusters, n_rows)
+    factors = centers[cluster] + rng.normal(size=(n_rows, n_factors))
+    weights = rng.normal(size=(n_factors, n_features))
+    X = factors @ weights + rng.normal(scale=0.3, size=(n_rows, n_features))
+    X = (X - X.mean(axis=0)) / X.std(axis=0)
+    y = np.where(cluster % 2 == 0, "Jedi", "Sith")
+    return X.astype(np.float32), y
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def recall(found, exact):
+    """
+    Share of the exact k nearest neighbours the approximate search returned.
+    """
+    hits = sum(len(np.intersect1d(f, e)) for f, e in zip(found, exact))
+    return hits / exact.size
+
+
+def main():
+    """
+    Compare exact kNN with the LSH backend on synthetic knight-like data:
+    recall of the true neighbours, agreement of the predictions, and time
+    per query, for a grid of n_tables and n_bits.
+        python ann_benchmark.py --rows 1000000 --queries 2000
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--tables", type=int, nargs="*", default=[4, 8, 16])
+    parser.add_argument("--bits", type=int, nargs="*", default=[8, 12, 16])
+    args = parser.parse_args()
+
+    X, y = knight_like_data(args.rows + args.queries)
+    X_train, y_train = X[:args.rows], y[:args.rows]
+    X_query = X[args.rows:]
+
+    exact = KNeighborsClassifier(n_neighbors=args.k)
+    _, fit_time = timed(exact.fit, X_train, y_train)
+    exact_idx, query_time = timed(exact.kneighbors, X_query, return_distance=False)
+    exact_pred = exact.predict(X_query)
+    results = [{"backend": "exact", "fit s": fit_time,
+                "ms/query": 1000 * query_time / args.queries,
+                "recall": 1.0, "same prediction": 1.0}]
+
+    for n_tables in args.tables:
+        for n_bits in args.bits:
+            ann = LSHNeighborsClassifier(args.k, n_tables=n_tables, n_bits=n_bits)
+            _, fit_time = timed(ann.fit, X_train, y_train)
+            idx, query_time = timed(ann.kneighbors, X_query, return_distance=False)
+            pred = ann.predict(X_query)
+            results.append({"backend": f"lsh {n_tables}x{n_bits}", "fit s": fit_time,
+                            "ms/query": 1000 * query_time / args.queries,
+                            "recall": recall(idx, exact_idx),
+                            "same prediction": np.mean(pred == exact_pred)})
+
+    print(pd.DataFrame(results).set_index("backend")
+          .to_string(float_format=lambda x: f"{x:.4g}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import numpy as np
+import time
+import sys
+import os
+from sklearn.neighbors import NearestNeighbors, KNeighborsClassifier
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "..", "DS03", "ex03"))
+from scaling import Scaler
+from sklearn.metrics import f1_score, accuracy_score
+
+
+def neighbor_codes(X_train, y_train, X_val, k_max):
+    """
+    Query the k_max nearest training points of every validation point once.
+    Returns (classes, codes) where codes[i, j] is the class code of the
+    (j+1)-th nearest neighbour of validation point i.
+    """
+    nn = NearestNeighbors(n_neighbors=k_max).fit(X_train)
+    _, idx = nn.kneighbors(X_val)
+    classes, y_codes = np.unique(np.asarray(y_train), return_inverse=True)
+    return classes, y_codes[idx]
+
+
+def prefix_votes(codes, n_classes):
+    """
+    Majority vote among the first k neighbours, for every k at once.
+    Returns an array of class codes of shape (k_max, n_val).
+    Ties go to the smallest class, as in KNeighborsClassifier.
+    """
+    counts = np.stack([(codes == c).cumsum(axis=1, dtype=np.int32)
+                       for c in range(n_classes)])
+    return counts.argmax(axis=0).T
+
+
+def sweep_k(X_train, y_train, X_val, y_val, k_values):
+    """
+    Accuracy and weighted F1-score of KNN for every k in k_values, from a
+    single neighbour query with max(k_values) neighbours.
+    Returns (acc_list, f1_scores).
+    """
+    k_values = list(k_values)
+    classes, codes = neighbor_codes(X_train, y_train, X_val, max(k_values))
+    votes = prefix_votes(codes, len(classes))
+
+    acc_list = []
+    f1_scores = []
+    for k in k_values:
+        y_pred = classes[votes[k - 1]]
+        acc_list.append(accuracy_score(y_val, y_pred))
+        f1_scores.append(f1_score(y_val, y_pred, average="weighted"))
+    return acc_list, f1_scores
+
+
+def fold_scores(df_train, df_val, k_values):
+    """
+    Scale one cross-validation fold on its training part and return
+    sweep_k's (acc_list, f1_scores) for it.
+    """
+    scaler = Scaler().fit(df_train)
+    X_train = scaler.transform(df_train)
+    X_val = scaler.transform(df_val)
+    return sweep_k(X_train, df_train["knight"], X_val, df_val["knight"], k_values)
+
+
+def loop_k(X_train, y_train, X_val, y_val, k_values):
+    """
+    The same scores with one KNeighborsClassifier fit and query per k.
+    """
+    acc_list = []
+    f1_scores = []
+    for k in k_values:
+        knn = KNeighborsClassifier(n_neighbors=k)
+        knn.fit(X_train, y_train)
+        y_pred = knn.predict(X_val)
+        acc_list.append(accuracy_score(y_val, y_pred))
+        f1_scores.append(f1_score(y_val, y_pred, average="weighted"))
+    return acc_list, f1_scores
+
+
+def compare_with_loop(X_train, y_train, X_val, y_val, k_values):
+    """
+    Time the single-query sweep against the per-k loop and check that
+    both give the same scores.
+    """
+    start = time.perf_counter()
+    loop_scores = loop_k(X_train, y_train, X_val, y_val, k_values)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sweep_scores = sweep_k(X_train, y_train, X_val, y_val, k_values)
+    sweep_time = time.perf_counter() - start
+
+    same = np.allclose(loop_scores, sweep_scores)
+    print(f"per-k loop: {loop_time:.3f}s, single-query sweep: {sweep_time:.3f}s "
+          f"(x{loop_time / sweep_time:.1f}), same scores: {same}")
+    return loop_time, sweep_time, same
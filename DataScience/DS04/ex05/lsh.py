@@ -0,0 +1,125 @@
+import numpy as np
+
+CHUNK_SIZE = 100_000
+QUERY_BATCH = 128
+
+
+class LSHNeighborsClassifier:
+    """
+    Approximate k-nearest-neighbours classifier on random-projection LSH.
+
+    Every table hashes a point to the signs of its projections on n_bits
+    random hyperplanes, so close points tend to share a bucket. A query
+    only computes exact distances to the points sharing one of its
+    buckets, in any of the n_tables tables.
+
+    Trade-off knobs: more tables find more true neighbours (recall) but
+    scan more candidates; more bits make smaller buckets, faster queries
+    and lower recall. Features should be centred, e.g. standardized.
+    Queries with fewer than n_neighbors candidates fall back to an exact
+    scan. Same fit / predict / kneighbors API as KNeighborsClassifier.
+    """
+
+    def __init__(self, n_neighbors=5, n_tables=8, n_bits=12, random_state=42):
+        self.n_neighbors = n_neighbors
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.random_state = random_state
+
+    def _hash(self, X):
+        """
+        Bucket key of every point in every table, shape (n, n_tables).
+        """
+        weights = 1 << np.arange(self.n_bits, dtype=np.int64)
+        keys = np.empty((len(X), self.n_tables), dtype=np.int64)
+        for start in range(0, len(X), CHUNK_SIZE):
+            bits = X[start:start + CHUNK_SIZE] @ self.planes_ > 0
+            bits = bits.reshape(len(bits), self.n_tables, self.n_bits)
+            keys[start:start + CHUNK_SIZE] = bits @ weights
+        return keys
+
+    def fit(self, X, y):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        rng = np.random.default_rng(self.random_state)
+        self.planes_ = rng.normal(size=(X.shape[1], self.n_tables * self.n_bits)
+                                  ).astype(np.float32)
+        self.classes_, self.y_codes_ = np.unique(np.asarray(y), return_inverse=True)
+        self.X_ = X
+        self.sq_norms_ = np.einsum("ij,ij->i", X, X)
+
+        keys = self._hash(X)
+        self.order_ = np.argsort(keys, axis=0, kind="stable")
+        self.sorted_keys_ = np.take_along_axis(keys, self.order_, axis=0)
+        return self
+
+    def _candidates(self, lo, hi):
+        """
+        (query, point) pairs sharing a bucket in at least one table,
+        without repeats, sorted by query.
+        """
+        n = len(self.X_)
+        pairs = []
+        for t in range(self.n_tables):
+            lengths = hi[:, t] - lo[:, t]
+            offsets = np.cumsum(lengths) - lengths
+            pos = (np.arange(lengths.sum()) - np.repeat(offsets, lengths)
+                   + np.repeat(lo[:, t], lengths))
+            query = np.repeat(np.arange(len(lo)), lengths)
+            pairs.append(query * n + self.order_[pos, t])
+        pairs = np.sort(np.concatenate(pairs))
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+        return pairs // n, pairs % n
+
+    def _exact(self, q, k):
+        dist = self.sq_norms_ - 2 * (self.X_ @ q)
+        top = np.argpartition(dist, k - 1)[:k]
+        return top[np.argsort(dist[top])]
+
+    def _query(self, Q, k):
+        """
+        Indices of the approximate k nearest neighbours of a batch of
+        queries, nearest first.
+        """
+        keys = self._hash(Q)
+        lo = np.empty_like(keys)
+        hi = np.empty_like(keys)
+        for t in range(self.n_tables):
+            lo[:, t] = np.searchsorted(self.sorted_keys_[:, t], keys[:, t], "left")
+            hi[:, t] = np.searchsorted(self.sorted_keys_[:, t], keys[:, t], "right")
+
+        query, point = self._candidates(lo, hi)
+        dist = self.sq_norms_[point] - 2 * np.einsum("ij,ij->i", self.X_[point], Q[query])
+        dist = dist.astype(np.float64)
+        span = dist.max() - dist.min() + 1 if len(dist) else 1
+        order = np.argsort(query * span + (dist - dist.min() if len(dist) else dist))
+        query, point = query[order], point[order]
+        starts = np.searchsorted(query, np.arange(len(Q)))
+        counts = np.bincount(query, minlength=len(Q))
+
+        indices = np.empty((len(Q), k), dtype=np.int64)
+        for i in range(len(Q)):
+            if counts[i] >= k:
+                indices[i] = point[starts[i]:starts[i] + k]
+            else:
+                indices[i] = self._exact(Q[i], k)
+        return indices
+
+    def kneighbors(self, X, n_neighbors=None, return_distance=True):
+        k = n_neighbors or self.n_neighbors
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        indices = np.concatenate([self._query(X[start:start + QUERY_BATCH], k)
+                                  for start in range(0, len(X), QUERY_BATCH)])
+        if not return_distance:
+            return indices
+        distances = np.linalg.norm(self.X_[indices] - X[:, None, :], axis=2)
+        return distances, indices
+
+    def predict(self, X):
+        """
+        Majority vote of the approximate neighbours,
+        ties going to the smallest class as in KNeighborsClassifier.
+        """
+        codes = self.y_codes_[self.kneighbors(X, return_distance=False)]
+        counts = np.stack([(codes == c).sum(axis=1)
+                           for c in range(len(self.classes_))], axis=1)
+        return self.classes_[counts.argmax(axis=1)]
@@ -1,7 +1,8 @@
 import pandas as pd
+import numpy as np
 import sys
-from collections import Counter
-from sklearn.preprocessing import StandardScaler
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.neighbors import KNeighborsClassifier
@@ -9,30 +10,53 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import f1_score
 
 sys.path.append("../../DS03/ex05")
-from split import split
-
-
-def train_classifier(df_train, model_type):
+from cross_validation import cross_validate
+sys.path.append("../../DS03/ex03")
+from scaling import Scaler
+sys.path.append("../ex05")
+from knn_sweep import fold_scores
+from model_registry import get_or_train, clear_registry
+
+MODELS = ["decision_tree", "knn", "logistic_regression"]
+SCALED_MODELS = ["knn", "logistic_regression"]
+K_VALUES = range(1, 31)
+MODEL_PARAMS = {
+    "decision_tree": {"random_state": 42},
+    "random_forest": {"n_estimators": 100, "random_state": 42},
+    "knn": {"k_values": [K_VALUES.start, K_VALUES.stop], "n_splits": 5,
+            "scaling": "standard"},
+    "logistic_regression": {"max_iter": 1000, "scaling": "standard"},
+}
+
+
+def train_classifier(df_train, model_type, n_jobs=None, scaler=None):
     """
     Train a classifier of the given type on the training dataset.
+    n_jobs is passed to the cross-validation choosing k for KNN.
+    Scaled models use 'scaler', fitted on df_train, or fit their own.
     """
     X_train = df_train.drop(columns="knight")
     y_train = df_train["knight"]
 
-    scaler = None
-    if model_type in ["knn", "logistic_regression"]:
-        scaler = StandardScaler()
-        X_train = scaler.fit_transform(X_train)
+    if model_type in SCALED_MODELS:
+        if scaler is None:
+            scaler = Scaler().fit(df_train)
+        X_train = scaler.transform(df_train)
+    else:
+        scaler = None
 
     if model_type == "decision_tree":
-        clf = DecisionTreeClassifier(random_state=42)
+        clf = DecisionTreeClassifier(**MODEL_PARAMS[model_type])
     elif model_type == "random_forest":
-        clf = RandomForestClassifier(n_estimators=100, random_state=42)
+        clf = RandomForestClassifier(**MODEL_PARAMS[model_type])
     elif model_type == "knn":
-        k = find_best_k(df_train)
+        k = find_best_k(df_train, n_jobs=n_jobs,
+                        n_splits=MODEL_PARAMS[model_type]["n_splits"])
         clf = KNeighborsClassifier(n_neighbors=k)
     elif model_type == "logistic_regression":
-        clf = LogisticRegression(max_iter=1000)
+        params = {key: value for key, value in MODEL_PARAMS[model_type].items()
+                  if key != "scaling"}
+        clf = LogisticRegression(**params)
     else:
         raise ValueError("Invalid model_type. Choose a valid model type.")
 
@@ -40,115 +64,190 @@ def train_classifier(df_train, model_type):
     return clf, scaler
 
 
-def make_predictions(clf, df_test, scaler=None):
+def registered_classifier(df_train, model_type, n_jobs=None, scaler=None):
+    """
+    The classifier of train_classifier, taken from the model registry when
+    the same data and hyperparameters were already trained, in this run
+    or a previous one.
+    """
+    if model_type not in MODEL_PARAMS:
+        raise ValueError("Invalid model_type. Choose a valid model type.")
+    return get_or_train(df_train, model_type, MODEL_PARAMS[model_type],
+                        partial(train_classifier, n_jobs=n_jobs, scaler=scaler))
+
+
+def train_members(df_train, models=MODELS, n_jobs=None, registry=True):
+    """
+    Train (or fetch from the registry) every ensemble member, concurrently
+    in a process pool; with n_jobs=1, one after another in this process.
+    The k search of KNN runs inside its member's worker.
+    The scaled members share one scaler, fitted here once.
+    With registry=False the members are trained without being stored,
+    for throwaway fits such as cross-validation folds.
+    """
+    scaler = None
+    if any(model in SCALED_MODELS for model in models):
+        scaler = Scaler().fit(df_train)
+    train = registered_classifier if registry else train_classifier
+    if n_jobs == 1:
+        return [train(df_train, model, n_jobs=1, scaler=scaler) for model in models]
+    with ProcessPoolExecutor(max_workers=n_jobs or len(models)) as pool:
+        return list(pool.map(partial(train, df_train, n_jobs=1, scaler=scaler),
+                             models))
+
+
+def make_predictions(clf, df_test, scaler=None, proba=False):
     """
-    Generate predictions using a trained classifier.
+    Generate predictions using a trained classifier,
+    or class probabilities with 'proba'.
     """
     X_test = df_test
     if scaler is not None:
         X_test = scaler.transform(X_test)
+    if proba:
+        return clf.predict_proba(X_test)
     return clf.predict(X_test)
 
 
-def find_best_k(df):
+def find_best_k(df, n_jobs=None, n_splits=5):
     """
-    Determine the optimal number of neighbors (k) for KNN using validation F1-score.
+    Determine the optimal number of neighbors (k) for KNN using the mean
+    cross-validated F1-score, scoring every k from a single neighbour query.
     """
-    split(df, 0.8)
-    df_train = pd.read_csv("Training_knight.csv")
-    df_val = pd.read_csv("Validation_knight.csv")
+    scores = cross_validate(df, partial(fold_scores, k_values=K_VALUES), n_splits,
+                            n_jobs=n_jobs)
+    f1_scores = list(np.mean([f1 for _, f1 in scores], axis=0))
 
-    scaler = StandardScaler()
+    best_k = f1_scores.index(max(f1_scores)) + 1
+    return best_k
 
-    X_train = df_train.drop(columns="knight")
-    y_train = df_train["knight"]
 
-    X_val = df_val.drop(columns="knight")
-    y_val = df_val["knight"]
+def save_votes(votes, out_path):
+    if out_path is not None:
+        with open(out_path, "w") as f:
+            f.write("\n".join(votes) + "\n")
 
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_val_scaled = scaler.transform(X_val)
 
-    f1_scores = []
-    k_values = range(1, 31)
+def majority_voting(predictions, out_path="Voting.txt"):
+    """
+    Perform majority voting across predictions from multiple classifiers.
+    Labels are encoded once and counted per row with a single bincount;
+    ties go to the label of the earliest classifier among the tied ones.
+    The votes are saved to out_path unless it is None.
+    """
+    factorized = [pd.factorize(np.asarray(pred)) for pred in predictions]
+    classes = np.unique(np.concatenate([uniques for _, uniques in factorized]))
+    codes = np.stack([np.searchsorted(classes, uniques)[member_codes]
+                      for member_codes, uniques in factorized])
+    n_members, n_rows = codes.shape
+    n_classes = len(classes)
+    rows = np.arange(n_rows)
+
+    counts = np.bincount((codes + n_classes * rows).ravel(),
+                         minlength=n_classes * n_rows).reshape(n_rows, n_classes)
+    first = np.full((n_rows, n_classes), n_members)
+    for member in reversed(range(n_members)):
+        first[rows, codes[member]] = member
+    votes = classes[np.argmax(counts * (n_members + 1) - first, axis=1)]
+
+    save_votes(votes, out_path)
+    return votes
 
-    for k in k_values:
-        knn = KNeighborsClassifier(n_neighbors=k)
-        knn.fit(X_train_scaled, y_train)
-        y_pred = knn.predict(X_val_scaled)
-        f1 = f1_score(y_val, y_pred, average="weighted")
-        f1_scores.append(f1)
 
-    best_k = f1_scores.index(max(f1_scores)) + 1
-    return best_k
+def soft_voting(probabilities, weights=None, out_path="Voting.txt"):
+    """
+    Weighted soft voting: average the class probabilities of the
+    classifiers, given as (classes, proba) pairs, and keep the most
+    probable class. Equal weights by default.
+    The votes are saved to out_path unless it is None.
+    """
+    classes = np.unique(np.concatenate([c for c, _ in probabilities]))
+    weights = np.ones(len(probabilities)) if weights is None else np.asarray(weights)
+    n_rows = len(probabilities[0][1])
+    total = np.zeros((n_rows, len(classes)))
+    for (member_classes, proba), weight in zip(probabilities, weights):
+        total[:, np.searchsorted(classes, member_classes)] += weight * proba
+    votes = classes[np.argmax(total, axis=1)]
+
+    save_votes(votes, out_path)
+    return votes
 
 
-def majority_voting(predictions):
+def generate_model_predictions(df_train, df_test, n_jobs=None, voting="hard",
+                               registry=True):
     """
-    Perform majority voting across predictions from multiple classifiers.
+    Train multiple classifiers and generate predictions for the test set:
+    labels for hard voting, (classes, probabilities) pairs for soft voting.
     """
-    votes = []
-    for pred in zip(*predictions):
-        counts = Counter(pred)
-        winner = counts.most_common(1)[0][0]
-        votes.append(winner)
+    members = train_members(df_train, MODELS, n_jobs=n_jobs, registry=registry)
+    if voting == "soft":
+        return [(clf.classes_, make_predictions(clf, df_test, scaler, proba=True))
+                for clf, scaler in members]
+    return [make_predictions(clf, df_test, scaler) for clf, scaler in members]
 
-    with open("Voting.txt", "w") as f:
-        for v in votes:
-            f.write(v + "\n")
-    return votes
+
+def vote(predictions, voting="hard", weights=None, out_path="Voting.txt"):
+    if voting == "soft":
+        return soft_voting(predictions, weights, out_path)
+    if voting == "hard":
+        return majority_voting(predictions, out_path)
+    raise ValueError("Invalid voting. Choose 'hard' or 'soft'.")
 
 
-def generate_model_predictions(df_train, df_test):
+def ensemble_fold_f1(df_train, df_val, voting="hard"):
     """
-    Train multiple classifiers and generate predictions for the test set.
+    Train the ensemble on one cross-validation fold and return the
+    weighted F1-score of its votes. Runs inside a fold worker, so the
+    members and the inner search for k run sequentially. Fold models are
+    not kept in the model registry.
     """
-    models = ["decision_tree", "knn", "logistic_regression"]
-    predictions = []
-    for model in models:
-        clf, scaler = train_classifier(df_train, model_type=model)
-        pred = make_predictions(clf, df_test, scaler)
-        predictions.append(pred)
-    return predictions
+    X_val = df_val.drop(columns="knight")
+    y_val = df_val["knight"]
+
+    predictions = generate_model_predictions(df_train, X_val, n_jobs=1, voting=voting,
+                                             registry=False)
+    y_pred = vote(predictions, voting, out_path=None)
+    return f1_score(y_val, y_pred, average="weighted")
 
 
-def evaluate_voting_ensemble(df):
+def evaluate_voting_ensemble(df, n_splits=5, voting="hard"):
     """
-    Evaluate an ensemble of classifiers using majority voting on a validation set.
+    Evaluate an ensemble of classifiers using hard (majority) or soft
+    voting with stratified cross-validation, folds running in parallel.
 
     Args:
-        df (pd.DataFrame): Full dataset to split into training and validation.
+        df (pd.DataFrame): Full dataset to split into folds.
 
     Returns:
-        None: Prints weighted F1 score.
+        float: Mean weighted F1 score, also printed.
     """
-    split(df, 0.8)
-    df_train = pd.read_csv("Training_knight.csv")
-    df_val = pd.read_csv("Validation_knight.csv")
-
-    X_val = df_val.drop(columns="knight")
-    y_val = df_val["knight"]
-
-    predictions = generate_model_predictions(df_train, X_val)
-    y_pred = majority_voting(predictions)
-    score = f1_score(y_val, y_pred, average="weighted")
-    print(f"Weighted F1 Score: {score:.4f}")
+    scores = cross_validate(df, partial(ensemble_fold_f1, voting=voting), n_splits)
+    score = np.mean(scores)
+    print(f"Weighted F1 Score: {score:.4f} (± {np.std(scores):.4f} over {n_splits} folds)")
+    return score
 
 
 def main():
     """
     Main function to train models, apply majority voting, and evaluate ensemble performance.
+    Trained models are reused from the registry; --retrain empties it first.
+    --soft averages the class probabilities instead of counting votes.
     """
-    if len(sys.argv) != 3:
-        raise ValueError("Usage: python democracy.py <Train_knight.csv> <Test_knight.csv>")
-
-    path_train, path_test = sys.argv[1], sys.argv[2]
+    args = [arg for arg in sys.argv[1:] if arg not in ("--retrain", "--soft")]
+    if len(args) != 2:
+        raise ValueError("Usage: python democracy.py <Train_knight.csv> <Test_knight.csv> "
+                         "[--retrain] [--soft]")
+    if "--retrain" in sys.argv:
+        clear_registry()
+
+    path_train, path_test = args[0], args[1]
     df_train = pd.read_csv(path_train)
     df_test = pd.read_csv(path_test)
 
-    predictions = generate_model_predictions(df_train, df_test)
-    majority_voting(predictions)
-    evaluate_voting_ensemble(df_train)
+    voting = "soft" if "--soft" in sys.argv else "hard"
+    predictions = generate_model_predictions(df_train, df_test, voting=voting)
+    vote(predictions, voting)
+    evaluate_voting_ensemble(df_train, voting=voting)
 
 
 if __name__ == "__main__":
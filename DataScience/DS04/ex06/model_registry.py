@@ -0,0 +1,80 @@
+import pandas as pd
+import hashlib
+import pickle
+import shutil
+import json
+import os
+import sklearn
+
+REGISTRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            ".model_registry")
+
+
+def data_hash(df):
+    """
+    SHA-1 of the content of a frame: its column names and row values.
+    Rows in a different order give a different hash.
+    """
+    sha = hashlib.sha1(json.dumps(list(map(str, df.columns))).encode())
+    sha.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return sha.hexdigest()
+
+
+def model_key(df_train, model_type, params):
+    """
+    Registry key of a model: training data, model type, hyperparameters
+    and scikit-learn version.
+    """
+    description = json.dumps({"data": data_hash(df_train), "model": model_type,
+                              "params": params, "sklearn": sklearn.__version__},
+                             sort_keys=True)
+    return hashlib.sha1(description.encode()).hexdigest()
+
+
+def model_path(key):
+    return os.path.join(REGISTRY_DIR, f"{key}.pkl")
+
+
+def load_model(key):
+    """
+    The (model, scaler) pair stored under key, or None.
+    """
+    try:
+        with open(model_path(key), "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_model(key, model, scaler):
+    """
+    Store a (model, scaler) pair. The file is written under a temporary
+    name and renamed, so parallel writers never leave a partial file.
+    """
+    os.makedirs(REGISTRY_DIR, exist_ok=True)
+    tmp_path = f"{model_path(key)}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((model, scaler), f)
+    os.replace(tmp_path, model_path(key))
+
+
+def get_or_train(df_train, model_type, params, train):
+    """
+    Return the (model, scaler) trained on df_train with these params,
+    from the registry when it is there, otherwise by calling
+    train(df_train, model_type) and storing the result.
+    """
+    key = model_key(df_train, model_type, params)
+    cached = load_model(key)
+    if cached is not None:
+        return cached
+    model, scaler = train(df_train, model_type)
+    save_model(key, model, scaler)
+    return model, scaler
+
+
+def clear_registry():
+    """
+    Remove every stored model.
+    """
+    shutil.rmtree(REGISTRY_DIR, ignore_errors=True)
@@ -0,0 +1,132 @@
+import argparse
+import tempfile
+import shutil
+import json
+import time
+import sys
+import os
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ["DS00/ex03", "DS01/ex01", "DS01/ex02", "DS01/ex03"]:
+    sys.path.append(os.path.join(BASE, path))
+
+import automatic_table
+from customers_table import load_env_vars, connect_db, join_data, process_csv_file
+from remove_duplicates import delete_exact_duplicates, delete_temporal_duplicated
+from fusion import keep_most_complete_per_key, add_missing_columns_from_items, look_up
+from generate_data import generate_customers, generate_items, MONTHS
+
+STEPS = ["automatic_table", "join_data", "delete_exact_duplicates",
+         "delete_temporal_duplicated", "look_up"]
+
+
+def parse_size(text):
+    """
+    '1M' -> 1_000_000, '500k' -> 500_000, '2000' -> 2000.
+    """
+    units = {"k": 1_000, "m": 1_000_000}
+    text = text.strip().lower()
+    if text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def timed(timings, step, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    timings[step] = timings.get(step, 0.0) + time.perf_counter() - start
+    return result
+
+
+def drop_tables(cur, tables):
+    for table in tables:
+        cur.execute(f"DROP TABLE IF EXISTS {table};")
+
+
+def run_size(cur, n_rows, args):
+    """
+    Generate n_rows synthetic events, push them through ingestion, join,
+    dedup and lookup, and return the time spent in each step.
+    """
+    folder = tempfile.mkdtemp(prefix="bench_", dir=args.work_dir)
+    month_tables = [table for table, _, _ in MONTHS]
+    timings = {}
+    try:
+        customer_folder = os.path.join(folder, "customer")
+        item_folder = os.path.join(folder, "item")
+        start = time.perf_counter()
+        n_products = generate_customers(customer_folder, n_rows, args.dup_rate,
+                                        args.temporal_dup_rate)
+        generate_items(item_folder, n_products, args.item_overlap)
+        print(f"Data generated in {time.perf_counter() - start:.1f}s")
+
+        for table in month_tables:
+            timed(timings, "automatic_table", automatic_table.process_csv_file,
+                  cur, customer_folder, f"{table}.csv")
+        timed(timings, "join_data", join_data, cur, "customers", month_tables)
+        timed(timings, "delete_exact_duplicates", delete_exact_duplicates,
+              cur, "customers")
+        timed(timings, "delete_temporal_duplicated", delete_temporal_duplicated,
+              cur, "customers")
+
+        process_csv_file(cur, item_folder, "item.csv")
+        keep_most_complete_per_key(cur, "item", "product_id")
+        missing_cols = add_missing_columns_from_items(cur, "customers", "item")
+        timed(timings, "look_up", look_up, cur, missing_cols, "product_id",
+              "customers", "item")
+    finally:
+        drop_tables(cur, month_tables + ["customers", "item"])
+        shutil.rmtree(folder, ignore_errors=True)
+    return timings
+
+
+def print_results(results):
+    sizes = list(results)
+    print(f"\n{'step':<28}" + "".join(f"{s:>12}" for s in sizes))
+    for step in STEPS:
+        row = "".join(f"{results[s][step]:>11.2f}s" if step in results[s]
+                      else f"{'-':>12}" for s in sizes)
+        print(f"{step:<28}{row}")
+
+
+def main():
+    """
+    Benchmark the ingestion, dedup and fusion steps on synthetic data.
+
+    Run it against the throwaway database of this folder:
+        docker compose up -d
+        python benchmark.py 1M 10M 50M
+        docker compose down
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("sizes", nargs="*", default=["1M", "10M", "50M"])
+    parser.add_argument("--env", default=os.path.join(os.path.dirname(
+        os.path.abspath(__file__)), ".env"))
+    parser.add_argument("--dup-rate", type=float, default=0.05)
+    parser.add_argument("--temporal-dup-rate", type=float, default=0.02)
+    parser.add_argument("--item-overlap", type=float, default=0.8)
+    parser.add_argument("--work-dir", default=None,
+                        help="where the CSVs are generated (default: system temp)")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args()
+
+    db_config = load_env_vars(args.env)
+    conn, cur = connect_db(db_config)
+    results = {}
+    try:
+        for size in args.sizes:
+            print(f"\n=== {size} rows ===")
+            results[size] = run_size(cur, parse_size(size), args)
+    finally:
+        cur.close()
+        conn.close()
+        print("Database connection closed.")
+
+    print_results(results)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import uuid
+import sys
+import os
+
+MONTHS = [
+    ("data_2022_oct", "2022-10-01", "2022-11-01"),
+    ("data_2022_nov", "2022-11-01", "2022-12-01"),
+    ("data_2022_dec", "2022-12-01", "2023-01-01"),
+    ("data_2023_jan", "2023-01-01", "2023-02-01"),
+]
+EVENT_TYPES = np.array(["view", "cart", "remove_from_cart", "purchase"])
+EVENT_PROBS = [0.45, 0.25, 0.15, 0.15]
+BRANDS = np.array(["runail", "irisk", "masura", "grattol", "f.o.x", ""])
+CHUNK_SIZE = 1_000_000
+PRODUCT_BASE = 5_000_000
+USER_BASE = 400_000_000
+
+
+def format_times(seconds):
+    """
+    Format epoch seconds like the source CSVs: '2022-10-01 00:00:00 UTC'.
+    """
+    text = seconds.astype("datetime64[s]").astype(str)
+    return np.char.add(np.char.replace(text, "T", " "), " UTC")
+
+
+def session_pool(size, rng):
+    """
+    A pool of random session UUIDs shared by the generated events.
+    """
+    raw = rng.bytes(16 * size)
+    return np.array([str(uuid.UUID(bytes=raw[i:i + 16]))
+                     for i in range(0, len(raw), 16)])
+
+
+def generate_chunk(n_rows, start, end, n_users, n_products, sessions,
+                   dup_rate, temporal_dup_rate, rng):
+    """
+    Generate one chunk of events, with a share of exact duplicates and of
+    temporal duplicates (same event one second later).
+    """
+    n_dup = int(n_rows * dup_rate)
+    n_temp = int(n_rows * temporal_dup_rate)
+    n_base = n_rows - n_dup - n_temp
+
+    times = rng.integers(start, end, n_base)
+    event_type = rng.choice(EVENT_TYPES, n_base, p=EVENT_PROBS)
+    product_id = PRODUCT_BASE + rng.integers(0, n_products, n_base)
+    price = np.round(rng.gamma(2.0, 5.0, n_base), 2)
+    user_id = USER_BASE + rng.integers(0, n_users, n_base)
+    session = sessions[rng.integers(0, len(sessions), n_base)]
+
+    dup = rng.integers(0, n_base, n_dup)
+    temp = rng.integers(0, n_base, n_temp)
+    rows = np.concatenate([np.arange(n_base), dup, temp])
+    shift = np.concatenate([np.zeros(n_base + n_dup, dtype=np.int64),
+                            np.ones(n_temp, dtype=np.int64)])
+    order = rng.permutation(len(rows))
+    rows, shift = rows[order], shift[order]
+
+    return pd.DataFrame({
+        "event_time": format_times(np.minimum(times[rows] + shift, end - 1)),
+        "event_type": event_type[rows],
+        "product_id": product_id[rows],
+        "price": price[rows],
+        "user_id": user_id[rows],
+        "user_session": session[rows],
+    })
+
+
+def generate_customers(folder, n_rows, dup_rate=0.05, temporal_dup_rate=0.02,
+                       n_users=None, n_products=None, seed=42):
+    """
+    Write one data_YYYY_mon.csv per month with n_rows events in total.
+    Returns the number of distinct products the events can use.
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    n_users = n_users or max(1000, n_rows // 20)
+    n_products = n_products or max(100, n_rows // 200)
+    sessions = session_pool(min(max(n_rows // 10, 1), 1_000_000), rng)
+    per_month = n_rows // len(MONTHS)
+
+    for table, first, last in MONTHS:
+        start = int(pd.Timestamp(first).timestamp())
+        end = int(pd.Timestamp(last).timestamp())
+        path = os.path.join(folder, f"{table}.csv")
+        print(f"Generating {path} ({per_month} rows)...")
+        written = 0
+        while written < per_month:
+            size = min(CHUNK_SIZE, per_month - written)
+            chunk = generate_chunk(size, start, end, n_users, n_products,
+                                   sessions, dup_rate, temporal_dup_rate, rng)
+            chunk.to_csv(path, mode="w" if written == 0 else "a",
+                         header=written == 0, index=False)
+            written += size
+    return n_products
+
+
+def generate_items(folder, n_products, overlap=0.8, item_dup_rate=0.1,
+                   seed=42):
+    """
+    Write item.csv. 'overlap' is the share of event products present in
+    the item table; as many unrelated products are added as are missing.
+    A share of products appears twice, once with missing values.
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    n_match = int(n_products * overlap)
+    matching = PRODUCT_BASE + rng.choice(n_products, n_match, replace=False)
+    others = PRODUCT_BASE + n_products + np.arange(n_products - n_match)
+    product_id = np.concatenate([matching, others])
+
+    items = pd.DataFrame({
+        "product_id": product_id,
+        "category_id": pd.array(1487580000000000000
+                                + rng.integers(0, 10_000, len(product_id)),
+                                dtype="Int64"),
+        "category_code": "",
+        "brand": rng.choice(BRANDS, len(product_id)),
+    })
+    dups = items.sample(frac=item_dup_rate, random_state=seed).copy()
+    dups["category_id"] = pd.NA
+    dups["brand"] = ""
+    items = pd.concat([items, dups]).sample(frac=1, random_state=seed)
+
+    path = os.path.join(folder, "item.csv")
+    print(f"Generating {path} ({len(items)} rows)...")
+    items.to_csv(path, index=False)
+
+
+def main():
+    """
+    Usage: python generate_data.py <n_rows> <out_folder>
+    Writes <out_folder>/customer/data_YYYY_mon.csv and <out_folder>/item/item.csv.
+    """
+    if len(sys.argv) != 3:
+        raise ValueError("Usage: python generate_data.py <n_rows> <out_folder>")
+    n_rows, out = int(sys.argv[1]), sys.argv[2]
+    n_products = generate_customers(os.path.join(out, "customer"), n_rows)
+    generate_items(os.path.join(out, "item"), n_products)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+import hashlib
+import logging
+import json
+import time
+import os
+
+logger = logging.getLogger("pipeline")
+
+
+@dataclass
+class Stage:
+    """
+    One step of the pipeline.
+
+    inputs and outputs are resources: 'file:<path>', 'table:<name>'
+    or 'dir:<path>'. func receives its own (conn, cur).
+    """
+    name: str
+    func: object
+    inputs: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+
+
+def file_fingerprint(path, block_size=1 << 20):
+    """
+    SHA-1 of the file content, or None if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def table_fingerprint(cur, table):
+    """
+    Identity, row count and write counters of a table, or None if the
+    table does not exist.
+
+    The oid changes when the table is recreated, and the inserted,
+    updated and deleted tuple counters of pg_stat_user_tables change on
+    in-place writes that keep the row count (fusion's UPDATEs, a reload
+    with the same number of rows). The counters are statistics: they
+    can lag behind the last write by a moment and are lost on a stats
+    reset, which only ever makes a stage run again.
+    """
+    cur.execute("SELECT to_regclass(%s)::oid", (table,))
+    oid = cur.fetchone()[0]
+    if oid is None:
+        return None
+    cur.execute(f"SELECT COUNT(*) FROM {table}")
+    count = cur.fetchone()[0]
+    cur.execute("SELECT pg_stat_clear_snapshot()")
+    cur.execute("""
+        SELECT n_tup_ins, n_tup_upd, n_tup_del
+        FROM pg_stat_user_tables
+        WHERE relid = %s
+    """, (oid,))
+    counters = cur.fetchone() or (None, None, None)
+    return [int(oid), count, *counters]
+
+
+def fingerprint(cur, resource):
+    """
+    Fingerprint of a resource: file content hash, table identity, row
+    count and write counters, or whether a directory exists.
+    """
+    kind, name = resource.split(":", 1)
+    if kind == "file":
+        return file_fingerprint(name)
+    if kind == "table":
+        return table_fingerprint(cur, name)
+    if kind == "dir":
+        return os.path.isdir(name) or None
+    raise ValueError(f"Unknown resource kind '{kind}' in '{resource}'.")
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    with open(path, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def resolve_dependencies(stages):
+    """
+    Map every stage name to the names of the stages it depends on.
+    Stages are declared in pipeline order: a stage depends on the latest
+    earlier stage that writes one of its inputs, so stages that update a
+    table in place (dedup, fusion) are chained one after the other.
+    """
+    producers = {}
+    deps = {}
+    for stage in stages:
+        deps[stage.name] = {producers[r] for r in stage.inputs
+                            if r in producers}
+        for resource in stage.outputs:
+            producers[resource] = stage.name
+    return deps
+
+
+def is_up_to_date(cur, stage, state):
+    """
+    A stage can be skipped when it completed in the last run, its inputs
+    look exactly as they did at the end of that run and all its outputs
+    still exist.
+
+    Fingerprints are taken once, when the whole run is over: stages that
+    rewrite a table in place (dedup, fusion) would otherwise record a
+    state of the table that the next stage changes.
+    """
+    if stage.name not in state.get("stages", []):
+        return False
+    recorded = state.get("resources", {})
+    for resource in stage.inputs:
+        if resource not in recorded or fingerprint(cur, resource) != recorded[resource]:
+            return False
+    return all(fingerprint(cur, r) is not None for r in stage.outputs)
+
+
+def final_state(cur, stages):
+    """
+    State recorded after a complete run: the stage names and the
+    fingerprint of every resource they read or write.
+    """
+    resources = {r for stage in stages for r in stage.inputs + stage.outputs}
+    return {"stages": [stage.name for stage in stages],
+            "resources": {r: fingerprint(cur, r) for r in sorted(resources)}}
+
+
+def run_stage(stage, connect):
+    """
+    Worker: run one stage on its own connection and return its duration.
+    """
+    conn, cur = connect()
+    try:
+        start = time.perf_counter()
+        stage.func(conn, cur)
+        return time.perf_counter() - start
+    finally:
+        cur.close()
+        conn.close()
+
+
+def run_dag(stages, connect, state_path, max_workers=4, force=False):
+    """
+    Run the stages in dependency order.
+
+    Independent stages run concurrently, each on its own connection.
+    A stage is skipped, unless force is set, when none of its upstream
+    stages ran and its inputs are unchanged since the end of the last
+    run. The state is only saved when every stage completed, so a failed
+    run is entirely re-checked by the next one.
+    Returns a report {stage: (status, seconds)}.
+    """
+    deps = resolve_dependencies(stages)
+    by_name = {stage.name: stage for stage in stages}
+    state = load_state(state_path)
+    report = {}
+    done = set()
+    changed = set()
+    running = {}
+
+    conn, cur = connect()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while len(done) < len(stages):
+                ready = [name for name in by_name
+                         if name not in done and name not in running.values()
+                         and deps[name] <= done]
+                for name in ready:
+                    stage = by_name[name]
+                    if (not force and not deps[name] & changed
+                            and is_up_to_date(cur, stage, state)):
+                        logger.info("Stage '%s' skipped (inputs unchanged)", name)
+                        report[name] = ("skipped", 0.0)
+                        done.add(name)
+                        continue
+                    logger.info("Stage '%s' started", name)
+                    running[pool.submit(run_stage, stage, connect)] = name
+
+                if not running:
+                    if len(done) < len(stages) and not ready:
+                        raise ValueError("Pipeline stages have unresolved dependencies.")
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    seconds = future.result()
+                    logger.info("Stage '%s' finished in %.2fs", name, seconds)
+                    report[name] = ("ran", seconds)
+                    changed.add(name)
+                    done.add(name)
+        save_state(state_path, final_state(cur, stages))
+    finally:
+        cur.close()
+        conn.close()
+
+    print_report(report)
+    return report
+
+
+def print_report(report):
+    """
+    Print the status and duration of every stage.
+    """
+    print(f"{'stage':<30} {'status':<8} {'seconds':>8}")
+    for name, (status, seconds) in report.items():
+        print(f"{name:<30} {status:<8} {seconds:>8.2f}")
+    total = sum(seconds for _, seconds in report.values())
+    print(f"{'total':<30} {'':<8} {total:>8.2f}")
@@ -0,0 +1,296 @@
+import argparse
+import logging
+import json
+import time
+import sys
+import os
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ["DS01/ex01", "DS01/ex02", "DS01/ex03", "DS02/ex00", "DS02/ex01",
+             "DS02/ex02", "DS02/ex03", "DS02/ex04", "DS02/ex05", "DS02/batch"]:
+    sys.path.append(os.path.join(BASE, path))
+
+from customers_table import (load_env_vars, connect_db, select_tables_to_join, join_data,
+                             process_csv_file)
+from remove_duplicates import (select_table, delete_exact_duplicates, delete_temporal_duplicated,
+                               dedup_by_month)
+from fusion import (select_and_proccess_tables, find_common_key, choose_column,
+                    keep_most_complete_per_key, add_missing_columns_from_items, look_up)
+from maintenance import maintained, analyze_tables
+from projection import refresh_purchases, projection_name
+from render_charts import load_data, render_all
+from dag import Stage, run_dag
+
+logger = logging.getLogger("pipeline")
+
+
+def run_ingest(conn, cur, spec, job):
+    """
+    Load every CSV of a folder and join the selected tables into one table.
+    """
+    table = spec.get("table", job["table"])
+    selected = select_tables_to_join(cur, spec["folder"],
+                                     spec.get("tables", "all"))
+    join_tables(cur, table, selected)
+
+
+def join_tables(cur, table, tables):
+    """
+    Join the monthly tables into one, collect its statistics
+    and build its purchase projection.
+    """
+    join_data(cur, table, tables)
+    analyze_tables(cur, [table])
+    refresh_purchases(cur, table, rebuild=True)
+
+
+def run_dedup(conn, cur, spec, job):
+    """
+    Remove exact and temporal duplicates from a table.
+    With 'parallel', each month is processed on its own connection.
+    """
+    table = select_table(cur, spec.get("table", job["table"]))
+    with maintained(cur, "dedup", table):
+        if spec.get("parallel"):
+            dedup_by_month(load_env_vars(job["env"]), cur, table,
+                           spec.get("workers", 4))
+        else:
+            delete_exact_duplicates(cur, table)
+            delete_temporal_duplicated(cur, table)
+    refresh_purchases(cur, table, rebuild=True)
+
+
+def run_fusion(conn, cur, spec, job):
+    """
+    Add the columns of an item table to the main table through a key column.
+    """
+    table1 = select_table(cur, spec.get("table", job["table"]))
+    table2 = select_and_proccess_tables(cur, spec["folder"],
+                                        spec.get("item_table"))
+    fuse_tables(cur, table1, table2, spec.get("key"))
+
+
+def fuse_tables(cur, table1, table2, key=None):
+    """
+    Fill table1 with the columns of table2 it is missing, matching on key.
+    Without a key, the tables must share exactly one column: the pipeline
+    never prompts for it.
+    """
+    common_cols = find_common_key(cur, table1, table2)
+    if key is None and len(common_cols) > 1:
+        raise ValueError(f"Tables '{table1}' and '{table2}' share the columns "
+                         f"{sorted(common_cols)}; set 'key' in the fusion stage spec.")
+    common_col = choose_column(common_cols, "", key)
+    with maintained(cur, "fusion", table1, table2, common_col):
+        keep_most_complete_per_key(cur, table2, common_col)
+        missing_cols = add_missing_columns_from_items(cur, table1, table2)
+        look_up(cur, missing_cols, common_col, table1, table2)
+
+
+def run_charts(conn, cur, spec, job):
+    """
+    Render every DS02 chart of a table to an output directory.
+    The purchases are read from the table's purchase projection, so the
+    events table gets no analytics indexes here.
+    """
+    table = spec.get("table", job["table"])
+    pie_columns = spec.get("pie_columns", ["event_type"])
+    data = load_data(conn, cur, table, pie_columns)
+    render_all(data, table, spec.get("out_dir", "reports"), pie_columns,
+               formats=tuple(spec.get("formats", ["png"])))
+
+
+STAGES = {
+    "ingest": run_ingest,
+    "dedup": run_dedup,
+    "fusion": run_fusion,
+    "charts": run_charts,
+}
+
+
+def csv_stages(folder, selection="all"):
+    """
+    One load stage per CSV file of a folder, e.g. one per month.
+    """
+    stages = []
+    for filename in sorted(os.listdir(folder)):
+        table = os.path.splitext(filename)[0]
+        if not filename.endswith(".csv"):
+            continue
+        if selection != "all" and table not in selection:
+            continue
+        stages.append(Stage(
+            name=f"load:{table}",
+            func=lambda conn, cur, f=filename: process_csv_file(cur, folder, f),
+            inputs=[f"file:{os.path.join(folder, filename)}"],
+            outputs=[f"table:{table}"]))
+    return stages
+
+
+def build_dag(job):
+    """
+    Declare the job stages with the files and tables they read and write.
+    Ingest is split into one load stage per CSV file so months load
+    concurrently, followed by the join.
+    """
+    stages = []
+    for spec in job["stages"]:
+        name = spec["name"]
+        table = spec.get("table", job["table"])
+        if name == "ingest":
+            loads = csv_stages(spec["folder"], spec.get("tables", "all"))
+            month_tables = [s.outputs[0].split(":", 1)[1] for s in loads]
+            stages += loads
+            stages.append(Stage(
+                name=f"join:{table}",
+                func=lambda conn, cur, t=table, m=month_tables: join_tables(cur, t, m),
+                inputs=[f"table:{t}" for t in month_tables],
+                outputs=[f"table:{table}", f"table:{projection_name(table)}"]))
+        elif name == "fusion":
+            loads = csv_stages(spec["folder"],
+                               [spec["item_table"]] if "item_table" in spec else "all")
+            if len(loads) != 1:
+                raise ValueError("Fusion needs exactly one item table; set 'item_table'.")
+            item_table = loads[0].outputs[0].split(":", 1)[1]
+            stages += loads
+            stages.append(Stage(
+                name=f"fusion:{table}",
+                func=lambda conn, cur, t=table, i=item_table, k=spec.get("key"):
+                    fuse_tables(cur, t, i, k),
+                inputs=[f"table:{table}", f"table:{item_table}"],
+                outputs=[f"table:{table}", f"table:{item_table}"]))
+        elif name == "charts":
+            out_dir = spec.get("out_dir", "reports")
+            stages.append(Stage(
+                name=f"charts:{table}",
+                func=lambda conn, cur, s=spec: run_charts(conn, cur, s, job),
+                inputs=[f"table:{table}"],
+                outputs=[f"dir:{out_dir}"]))
+        elif name in STAGES:
+            outputs = [f"table:{table}"]
+            if name == "dedup":
+                outputs.append(f"table:{projection_name(table)}")
+            stages.append(Stage(
+                name=f"{name}:{table}",
+                func=lambda conn, cur, s=spec, n=name: STAGES[n](conn, cur, s, job),
+                inputs=[f"table:{table}"],
+                outputs=outputs))
+        else:
+            raise ValueError(f"Unknown stage '{name}'. Choose from {list(STAGES)}.")
+    return stages
+
+
+def load_job(path):
+    """
+    Read a job spec from a JSON or YAML file.
+    """
+    with open(path, "r") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ImportError("PyYAML is required to read YAML job specs.")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def job_from_args(args):
+    """
+    Build a job spec from command-line arguments, on top of the job file.
+    """
+    job = load_job(args.job) if args.job else {}
+    if args.env:
+        job["env"] = args.env
+    if args.table:
+        job["table"] = args.table
+    if "stages" not in job:
+        job["stages"] = [
+            {"name": "ingest", "folder": args.csv_folder},
+            {"name": "dedup"},
+            {"name": "fusion", "folder": args.item_folder, "key": args.key},
+            {"name": "charts", "out_dir": args.out_dir},
+        ]
+    if args.stages:
+        job["stages"] = [s for s in job["stages"] if s["name"] in args.stages]
+    job.setdefault("env", os.path.join(BASE, "DS01/ex00/.env"))
+    job.setdefault("table", "customers")
+    return job
+
+
+def run_job(job):
+    """
+    Run the stages of a job in order on one connection.
+    Returns the time spent on each stage.
+    """
+    db_config = load_env_vars(job["env"])
+    conn, cur = connect_db(db_config)
+    timings = {}
+    try:
+        for spec in job["stages"]:
+            name = spec["name"]
+            if name not in STAGES:
+                raise ValueError(f"Unknown stage '{name}'. Choose from {list(STAGES)}.")
+            logger.info("Stage '%s' started", name)
+            start = time.perf_counter()
+            STAGES[name](conn, cur, spec, job)
+            timings[name] = time.perf_counter() - start
+            logger.info("Stage '%s' finished in %.2fs", name, timings[name])
+    finally:
+        cur.close()
+        conn.close()
+        logger.info("Database connection closed.")
+
+    for name, seconds in timings.items():
+        logger.info("%-8s %8.2fs", name, seconds)
+    return timings
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run ingestion, dedup, fusion and charts without prompts.")
+    parser.add_argument("job", nargs="?", help="JSON or YAML job spec")
+    parser.add_argument("--env", help=".env file with the database settings")
+    parser.add_argument("--table", help="main table (default: customers)")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES),
+                        help="only run these stages")
+    parser.add_argument("--csv-folder", default=os.path.join(BASE, "DS01/data/customer"))
+    parser.add_argument("--item-folder", default=os.path.join(BASE, "DS01/data/item"))
+    parser.add_argument("--key", default="product_id")
+    parser.add_argument("--out-dir", default="reports")
+    parser.add_argument("--log", help="also write the log to this file")
+    parser.add_argument("--dag", action="store_true",
+                        help="run as a DAG: skip unchanged stages, run independent ones concurrently")
+    parser.add_argument("--state", default="pipeline_state.json",
+                        help="fingerprints of the last DAG run")
+    parser.add_argument("--force", action="store_true",
+                        help="in DAG mode, run every stage even if its inputs look unchanged "
+                             "(tables are compared by oid, row count and write counters)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="concurrent stages in DAG mode")
+    return parser.parse_args()
+
+
+def main():
+    """
+    Command-line entry point for the whole customer pipeline.
+    """
+    args = parse_args()
+    handlers = [logging.StreamHandler()]
+    if args.log:
+        handlers.append(logging.FileHandler(args.log))
+    logging.basicConfig(level=logging.INFO, handlers=handlers,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    job = job_from_args(args)
+    if args.dag:
+        db_config = load_env_vars(job["env"])
+        run_dag(build_dag(job), lambda: connect_db(db_config), args.state,
+                max_workers=args.workers, force=args.force)
+    else:
+        run_job(job)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+
+from dag import Stage, run_dag
+
+
+class FakeConnection:
+    def close(self):
+        pass
+
+
+def connect():
+    return FakeConnection(), FakeConnection()
+
+
+def build_stages(tmp_path):
+    """
+    Ingest, then two stages that rewrite the table in place, then charts:
+    the shape of the customer pipeline, on files.
+    """
+    source = tmp_path / "customers.csv"
+    table = tmp_path / "table.csv"
+    out_dir = tmp_path / "reports"
+
+    def ingest(conn, cur):
+        table.write_text(source.read_text())
+
+    def dedup(conn, cur):
+        lines = table.read_text().splitlines()
+        table.write_text("\n".join(dict.fromkeys(lines)) + "\n")
+
+    def fusion(conn, cur):
+        lines = table.read_text().splitlines()
+        table.write_text("\n".join(f"{line},brand" for line in lines) + "\n")
+
+    def charts(conn, cur):
+        os.makedirs(out_dir, exist_ok=True)
+
+    stages = [
+        Stage("ingest", ingest, [f"file:{source}"], [f"file:{table}"]),
+        Stage("dedup", dedup, [f"file:{table}"], [f"file:{table}"]),
+        Stage("fusion", fusion, [f"file:{table}"], [f"file:{table}"]),
+        Stage("charts", charts, [f"file:{table}"], [f"dir:{out_dir}"]),
+    ]
+    return source, stages
+
+
+def statuses(report):
+    return {name: status for name, (status, _) in report.items()}
+
+
+def test_second_run_on_unchanged_data_skips_every_stage(tmp_path):
+    source, stages = build_stages(tmp_path)
+    source.write_text("a\na\nb\n")
+    state_path = tmp_path / "state.json"
+
+    first = run_dag(stages, connect, state_path)
+    second = run_dag(stages, connect, state_path)
+
+    assert set(statuses(first).values()) == {"ran"}
+    assert set(statuses(second).values()) == {"skipped"}
+
+
+def test_changed_source_runs_every_downstream_stage(tmp_path):
+    source, stages = build_stages(tmp_path)
+    source.write_text("a\na\nb\n")
+    state_path = tmp_path / "state.json"
+
+    run_dag(stages, connect, state_path)
+    source.write_text("a\nc\n")
+    report = run_dag(stages, connect, state_path)
+
+    assert set(statuses(report).values()) == {"ran"}
+
+
+def test_force_runs_every_stage(tmp_path):
+    source, stages = build_stages(tmp_path)
+    source.write_text("a\nb\n")
+    state_path = tmp_path / "state.json"
+
+    run_dag(stages, connect, state_path)
+    report = run_dag(stages, connect, state_path, force=True)
+
+    assert set(statuses(report).values()) == {"ran"}